@@ -31,8 +31,9 @@ import bpy
 from vb30.lib.VRayStream import VRayExportFiles
 from vb30.lib.VRayStream import VRayPluginExporter
 from vb30.lib.VRayStream import VRayFilePaths
+from vb30.lib.VRayRenderQueue import VRayRenderQueue
 
-from vb30.lib import SysUtils, BlenderUtils
+from vb30.lib import SysUtils, BlenderUtils, LibUtils, ExportUtils, PathUtils
 
 from vb30.nodes import export as NodesExport
 
@@ -43,6 +44,7 @@ from vb30.exporting import exp_frame
 from vb30.exporting import exp_run
 from vb30.exporting import exp_anim_full
 from vb30.exporting import exp_anim_camera_loop
+from vb30.exporting import exp_anim_parallel
 
 from vb30 import debug
 
@@ -91,6 +93,9 @@ def Export(bus, scene, engine, isPreview=False):
                 o.write('MAIN', '\n#include "%s" // %s' % (filepath, includeFile.name))
             o.write('MAIN', '\n')
 
+    if VRayExporter.reduce_keyframes:
+        o.writeKeyframes()
+
     # No need for interpolate() anymore
     o.setAnimation(False)
     exp_settings.ExportSettings(bus)
@@ -125,12 +130,28 @@ def ExportEx(bus):
     pm.setSeparateFiles(VRayExporter.useSeparateFiles)
 
     pm.initFromScene(engine, scene)
+
+    # Every frame of the pipeline is exported into it's own file,
+    # so the file could be rendered while the next one is exported
+    pipelined = 'renderQueue' in bus
+    if pipelined:
+        pm.setExportFilename("%s_%04i" % (pm.getExportFilename(), scene.frame_current))
+
     pm.printInfo()
 
     fm = VRayExportFiles(pm)
-    fm.setOverwriteGeometry(VRayExporter.auto_meshes)
+    fm.setOverwriteGeometry(VRayExporter.auto_meshes or pipelined or exp_anim_parallel.IsChunkExport)
+    fm.setBufferSize(VRayExporter.write_buffer_size * 1024 * 1024)
+    fm.setBinaryMode(VRayExporter.write_binary)
 
     rtExporter = HAS_VB35 and engine.bl_idname == 'VRAY_RENDER_RT'
+
+    # RT exporter writes files by itself
+    if not rtExporter:
+        fm.setCompression(VRayExporter.compression, VRayExporter.compression_types)
+        fm.setIncremental(VRayExporter.incremental_export)
+        fm.setThreadedWrite(VRayExporter.write_threaded)
+
     try:
         fm.init(not rtExporter)
     except Exception as e:
@@ -139,6 +160,8 @@ def ExportEx(bus):
 
     o.setFileManager(fm)
     o.setPreview(engine.is_preview)
+    o.setKeyframeReduction(VRayExporter.reduce_keyframes, VRayExporter.reduce_keyframes_tolerance)
+    o.setAscii(LibUtils.UseAsciiTransform())
 
     if not rtExporter:
         bus['exporter'] = exp_init.InitExporter(bus)
@@ -190,11 +213,25 @@ def ExportEx(bus):
         err = str(e)
     finally:
         exp_init.ShutdownExporter(bus)
+        # Wait for asset copies before starting render
+        assetsErr = PathUtils.FinishDRAssets(bus)
+        if assetsErr and err is None:
+            err = assetsErr
+        # Files are buffered; write everything left
+        if not rtExporter:
+            try:
+                fm.closeFiles()
+            except Exception as e:
+                debug.ExceptionInfo(e)
+                err = "Error writing files: %s" % e
 
     return err
 
 
-def ExportAndRun(engine, scene):
+# @renderQueue - if set render process is not started, but appended
+#                to this list
+#
+def ExportAndRun(engine, scene, renderQueue=None):
     if engine.test_break():
         return "Export is interrupted!"
 
@@ -235,6 +272,9 @@ def ExportAndRun(engine, scene):
         },
     }
 
+    if renderQueue is not None:
+        bus['renderQueue'] = renderQueue
+
     if bus['camera'].type != 'CAMERA':
         return "Scene's active camera is not of type camera"
 
@@ -249,6 +289,80 @@ def ExportAndRun(engine, scene):
     return None
 
 
+# Frame by frame rendering with export of the next frames
+# while the previous ones are rendered
+#
+def RenderFramesPipelined(engine, scene):
+    VRayScene    = scene.vray
+    VRayExporter = VRayScene.Exporter
+
+    lookAhead = VRayExporter.pipeline_lookahead
+
+    rq = VRayRenderQueue()
+    rq.setMaxParallel(VRayExporter.pipeline_renders)
+    rq.setRetries(VRayExporter.render_retries)
+
+    # Split CPU threads between concurrent renders
+    if scene.render.threads_mode == 'AUTO':
+        if VRayExporter.pipeline_renders > 1:
+            rq.setThreads(os.cpu_count() or 1)
+    else:
+        rq.setThreads(scene.render.threads)
+
+    framesCount = len(range(scene.frame_start, scene.frame_end + 1, scene.frame_step))
+
+    state = {
+        'frame' : scene.frame_start,
+        'err'   : None,
+    }
+
+    def testBreak():
+        return engine.test_break() or state['err'] is not None
+
+    def exportNextFrame(rq):
+        failed = rq.getJobs('FAILED')
+        if failed:
+            state['err'] = "V-Ray exited with error code %s (%s)" % (failed[0].exitCode, failed[0].process.sceneFile)
+            return False
+
+        status = rq.getStatus()
+
+        engine.update_progress(status['DONE'] / framesCount)
+        engine.update_stats("", "V-Ray: Rendered %i of %i frames (rendering: %i, queued: %i)" % (
+            status['DONE'], framesCount, status['RUNNING'], status['QUEUED']))
+
+        f = state['frame']
+        if f > scene.frame_end or status['QUEUED'] >= lookAhead:
+            return False
+
+        scene.frame_set(f)
+
+        renderQueue = []
+
+        err = ExportAndRun(engine, scene, renderQueue)
+        if err is not None:
+            state['err'] = err
+            return False
+
+        for p in renderQueue:
+            rq.addJob(p, "Frame %i" % f)
+
+        state['frame'] = f + scene.frame_step
+
+        return True
+
+    rq.run(testBreak, exportNextFrame)
+
+    if state['err'] is not None:
+        rq.kill()
+        return state['err']
+
+    if engine.test_break():
+        return "Render is interrupted!"
+
+    return None
+
+
 # First check the animation type:
 #
 # 'FRAMEBYFRAME' "Export and render frame by frame"
@@ -268,15 +382,25 @@ def RenderScene(engine, scene):
         # Store current frame
         selected_frame = scene.frame_current
 
-        f = scene.frame_start
-        while(f <= scene.frame_end):
-            scene.frame_set(f)
-
-            err = ExportAndRun(engine, scene)
-            if err is not None:
-                break
-
-            f += scene.frame_step
+        # Settings are the same for every frame
+        # unless they are animated
+        ExportUtils.SetKeepSnapshots(True)
+
+        try:
+            if VRayExporter.frame_pipeline and not VRayExporter.submit_to_vray_cloud:
+                err = RenderFramesPipelined(engine, scene)
+            else:
+                f = scene.frame_start
+                while(f <= scene.frame_end):
+                    scene.frame_set(f)
+
+                    err = ExportAndRun(engine, scene)
+                    if err is not None:
+                        break
+
+                    f += scene.frame_step
+        finally:
+            ExportUtils.SetKeepSnapshots(False)
 
         # Restore selected frame
         scene.frame_set(selected_frame)
@@ -29,6 +29,7 @@ from vb30 import debug
 from . import exp_init
 from . import exp_scene
 from . import exp_camera
+from . import exp_anim_parallel
 
 
 def ExportCameraOnly(bus):
@@ -157,7 +158,9 @@ def ExportAnimation(bus, frameStart, frameEnd, frameStep):
     o.setFrameEnd(frameEnd)
     o.setFrameStep(frameStep)
 
-    if VRayExporter.animation_mode == 'NOTMESHES':
+    if VRayExporter.parallel_export and exp_anim_parallel.CanExportParallel(bus):
+        err = exp_anim_parallel.ExportParallel(bus)
+    elif VRayExporter.animation_mode == 'NOTMESHES':
         err = ExportFullNotMeshes(bus)
     elif VRayExporter.animation_mode == 'CAMERA':
         err = ExportCameraOnly(bus)
@@ -0,0 +1,271 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+# Parallel animation export
+#
+# Frame range is split into chunks, every chunk is exported
+# by a separate background Blender process into its own
+# directory and then included into the main scene file.
+#
+
+import os
+import sys
+import time
+import subprocess
+
+import bpy
+
+from vb30.lib import PathUtils
+
+from vb30 import debug
+
+
+# Code executed by the worker process
+WorkerExpr = "from vb30.exporting import exp_anim_parallel; exp_anim_parallel.ExportChunk()"
+
+# Set in the worker process
+IsChunkExport = False
+
+
+def GetWorkersCount(VRayExporter):
+    if VRayExporter.parallel_export_workers:
+        return VRayExporter.parallel_export_workers
+    return os.cpu_count() or 1
+
+
+# Meshes are exported by the chunks the same way as by a single
+# process: on every frame for 'FULL' and only on the first frame
+# for 'NOTMESHES', so then only the first chunk exports them;
+# all chunks are included into the same scene
+#
+def ChunkExportsMeshes(VRayExporter, chunkIndex):
+    if not VRayExporter.auto_meshes:
+        return False
+    return VRayExporter.animation_mode == 'FULL' or chunkIndex == 0
+
+
+# Splits frame range into (start, end) chunks
+#
+def GetFrameChunks(frameStart, frameEnd, frameStep, chunksCount):
+    frames = list(range(frameStart, frameEnd + 1, frameStep))
+    if not frames:
+        return []
+
+    chunkSize = -(-len(frames) // chunksCount)
+
+    chunks = []
+    for i in range(0, len(frames), chunkSize):
+        chunkFrames = frames[i:i+chunkSize]
+        chunks.append((chunkFrames[0], chunkFrames[-1]))
+
+    return chunks
+
+
+def CanExportParallel(bus):
+    scene  = bus['scene']
+    engine = bus['engine']
+    o      = bus['output']
+
+    VRayScene    = scene.vray
+    VRayExporter = VRayScene.Exporter
+
+    if engine.is_preview:
+        return False
+
+    if VRayExporter.animation_mode not in {'FULL', 'NOTMESHES'}:
+        return False
+
+    if GetWorkersCount(VRayExporter) < 2:
+        return False
+
+    if len(range(o.frameStart, o.frameEnd + 1, o.frameStep)) < 2:
+        return False
+
+    # Workers load scene from the file
+    if not bpy.data.filepath or bpy.data.is_dirty:
+        debug.PrintInfo("Parallel export requires saved *.blend file; exporting in a single process")
+        return False
+
+    if VRayScene.VRayDR.on or VRayExporter.submit_to_vray_cloud:
+        debug.PrintInfo("Parallel export is not supported with DR / Cloud; exporting in a single process")
+        return False
+
+    return True
+
+
+def GetChunkSceneFilepath(fm, chunkDirpath):
+    filename = "scene_scene" if fm.separateFiles else "scene"
+    return os.path.join(chunkDirpath, "%s%s" % (filename, fm.getFileExt('scene')))
+
+
+# Exports frame range in parallel and includes
+# exported chunks into the main scene file
+#
+@debug.TimeIt
+def ExportParallel(bus):
+    scene  = bus['scene']
+    engine = bus['engine']
+    o      = bus['output']
+
+    VRayScene    = scene.vray
+    VRayExporter = VRayScene.Exporter
+
+    fm = o.fileManager
+    pm = fm.getPathManager()
+
+    workersCount = GetWorkersCount(VRayExporter)
+
+    chunks = GetFrameChunks(o.frameStart, o.frameEnd, o.frameStep, workersCount)
+
+    chunksDirpath = os.path.join(pm.getExportDirectory(), "%s_chunks" % pm.getExportFilename())
+
+    jobs = []
+    for i, (chunkStart, chunkEnd) in enumerate(chunks):
+        # Chunk starts from the last frame of the previous chunk,
+        # so values that change right after the chunk border get
+        # the correct keyframe before the change
+        if i:
+            chunkStart -= o.frameStep
+
+        chunkDirpath = PathUtils.CreateDirectory(os.path.join(chunksDirpath, "chunk%04i" % i))
+
+        cmd = [
+            bpy.app.binary_path,
+            "-b", bpy.data.filepath,
+            "--python-expr", WorkerExpr,
+            "--",
+            scene.name,
+            "%i" % chunkStart,
+            "%i" % chunkEnd,
+            "%i" % o.frameStep,
+            chunkDirpath,
+            "%i" % ChunkExportsMeshes(VRayExporter, i),
+        ]
+
+        jobs.append({
+            'frames'   : (chunkStart, chunkEnd),
+            'cmd'      : cmd,
+            'dirpath'  : chunkDirpath,
+            'logpath'  : os.path.join(chunkDirpath, "export.log"),
+            'process'  : None,
+            'log'      : None,
+        })
+
+    debug.PrintInfo("Exporting frames %i-%i with %i processes..." % (o.frameStart, o.frameEnd, len(jobs)))
+
+    err = None
+
+    try:
+        for job in jobs:
+            debug.Debug(" ".join(job['cmd']))
+
+            job['log'] = open(job['logpath'], 'w')
+            job['process'] = subprocess.Popen(job['cmd'],
+                stdout=job['log'], stderr=subprocess.STDOUT)
+
+        running = list(jobs)
+        while running:
+            if engine.test_break():
+                err = "Export is interrupted!"
+                break
+
+            for job in list(running):
+                exitCode = job['process'].poll()
+                if exitCode is None:
+                    continue
+
+                running.remove(job)
+
+                if exitCode != 0 or not os.path.exists(GetChunkSceneFilepath(fm, job['dirpath'])):
+                    err = "Error exporting frames %i-%i; see \"%s\"" % (job['frames'] + (job['logpath'],))
+                    break
+
+                done = len(jobs) - len(running)
+
+                engine.update_progress(done / len(jobs))
+                engine.update_stats("", "V-Ray: Exported %i of %i frame chunks" % (done, len(jobs)))
+
+                debug.PrintInfo("Frames %i-%i exported [%i/%i]" % (job['frames'] + (done, len(jobs))))
+
+            if err is not None:
+                break
+
+            time.sleep(0.1)
+
+    finally:
+        for job in jobs:
+            process = job['process']
+            if process and process.poll() is None:
+                process.terminate()
+                process.wait()
+            if job['log']:
+                job['log'].close()
+
+    if err is not None:
+        return err
+
+    o.write('MAIN', "\n// Animation exported in %i chunks" % len(jobs))
+    for job in jobs:
+        o.write('MAIN', '\n#include "%s" // Frames %i-%i' % ((GetChunkSceneFilepath(fm, job['dirpath']),) + job['frames']))
+    o.write('MAIN', '\n')
+
+    return None
+
+
+# Worker process entry point
+#
+# Arguments (after "--"): scene name, frame start, frame end, frame step,
+# output directory, export meshes
+#
+def ExportChunk():
+    global IsChunkExport
+
+    argv = sys.argv[sys.argv.index("--") + 1:]
+
+    sceneName, frameStart, frameEnd, frameStep, outputDirpath, exportMeshes = argv
+
+    scene = bpy.data.scenes[sceneName]
+
+    VRayScene    = scene.vray
+    VRayExporter = VRayScene.Exporter
+
+    scene.frame_start = int(frameStart)
+    scene.frame_end   = int(frameEnd)
+    scene.frame_step  = int(frameStep)
+
+    # Only export the chunk
+    VRayExporter.parallel_export = False
+    VRayExporter.autorun         = False
+    VRayExporter.gen_run_file    = False
+
+    VRayExporter.output        = 'USER'
+    VRayExporter.output_dir    = outputDirpath
+    VRayExporter.output_unique = False
+
+    # Chunk directory is new, so geometry file is always written
+    # (see ExportEx); meshes are exported only if set for the chunk
+    VRayExporter.auto_meshes = bool(int(exportMeshes))
+    IsChunkExport = True
+
+    bpy.ops.render.render(scene=scene.name)
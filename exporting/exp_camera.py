@@ -31,17 +31,71 @@ from vb30.plugins import PLUGINS_ID
 from vb30 import debug
 
 
+# Checks if camera plugins could change during animation
+#
+def IsCameraAnimated(scene, camera):
+    VRayScene  = scene.vray
+    VRayCamera = camera.data.vray
+
+    # Camera could be switched with markers
+    for marker in scene.timeline_markers:
+        if marker.camera:
+            return True
+
+    # Settings or resolution animation
+    if BlenderUtils.HasAnimationCurves(scene, ('vray.', 'render.')):
+        return True
+
+    # Camera transform
+    ob = camera
+    while ob:
+        if BlenderUtils.HasAnimationCurves(ob) or len(ob.constraints):
+            return True
+        ob = ob.parent
+
+    # Camera settings
+    if BlenderUtils.IsAnimated(camera) or BlenderUtils.IsDataAnimated(camera):
+        return True
+    if BlenderUtils.HasAnimationCurves(camera.data):
+        return True
+
+    # Depends on other objects
+    dofObject = camera.data.dof_object
+    if dofObject:
+        if BlenderUtils.IsAnimated(dofObject) or len(dofObject.constraints):
+            return True
+
+    if VRayScene.BakeView.use:
+        return True
+    if VRayCamera.CameraStereoscopic.use:
+        return True
+
+    return False
+
+
 @debug.TimeIt
 def ExportCamera(bus):
     scene  = bus['scene']
     camera = bus['camera']
     engine = bus['engine']
+    o      = bus['output']
 
     scene, camera = BlenderUtils.GetSceneAndCamera(bus)
 
     VRayScene  = scene.vray
     VRayCamera = camera.data.vray
 
+    # Non-animated camera is exported only once per animation;
+    # any other frame will have exactly the same values
+    if o.isAnimation and 'cache' in bus:
+        cameraKey = (scene.as_pointer(), camera.as_pointer())
+        if bus['cache'].get('camera') == cameraKey:
+            return None
+        if not IsCameraAnimated(scene, camera):
+            bus['cache']['camera'] = cameraKey
+        else:
+            bus['cache'].pop('camera', None)
+
     # NOTE: Order is vital here
     cameraPlugins = (
         'SettingsMotionBlur',
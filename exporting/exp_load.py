@@ -22,11 +22,36 @@
 # All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
 #
 
-import time
 import os
 
 from vb30 import debug
 
+
+# Output file check interval (in seconds)
+WatchInterval = 0.1
+
+
+# Returns (filepath, mtime, size) of the first existing file
+#
+def GetImageStat(imageFiles):
+    for imageFile in imageFiles:
+        try:
+            st = os.stat(imageFile)
+        except OSError:
+            continue
+        return (imageFile, st.st_mtime, st.st_size)
+    return None
+
+
+def LoadLayer(layer, imageFile):
+    try:
+        layer.load_from_file(imageFile)
+    except Exception as e:
+        debug.Debug("Error loading file! [%s]" % e, msgType='ERROR')
+        return False
+    return True
+
+
 @debug.TimeIt
 def LoadImage(scene, engine, o, p):
     VRayScene    = scene.vray
@@ -49,23 +74,82 @@ def LoadImage(scene, engine, o, p):
     resolution_x = int(scene.render.resolution_x * scene.render.resolution_percentage * 0.01)
     resolution_y = int(scene.render.resolution_y * scene.render.resolution_percentage * 0.01)
 
-    # TODO: Create VRayImage loader and load image while rendering
-    #
+    imageFiles = [imageFile]
+    if engine.is_preview:
+        imageFiles.append(imageFilePreviewCompat)
+
+    result = engine.begin_result(0, 0, resolution_x, resolution_y)
+    layer  = result.layers[0]
+
+    # Image file state at the last load and at the last check;
+    # file left from the previous render is never loaded while rendering
+    loadedStat = GetImageStat(imageFiles)
+    lastStat   = None
+
     while not engine.test_break():
-        if not p.is_running():
-            result = engine.begin_result(0, 0, resolution_x, resolution_y)
-            if engine.test_break():
-                break
+        isDone = p.wait(WatchInterval)
+
+        imageStat = GetImageStat(imageFiles)
+
+        if isDone:
+            if imageStat:
+                LoadLayer(layer, imageStat[0])
+            break
+
+        # Load the image written while rendering (f.e. progressive EXR)
+        # once it's stopped changing
+        if imageStat and imageStat == lastStat and imageStat != loadedStat:
+            if LoadLayer(layer, imageStat[0]):
+                engine.update_result(result)
+            loadedStat = imageStat
+
+        lastStat = imageStat
+
+    # Rendering is cancelled
+    if engine.test_break():
+        p.kill()
+
+    engine.end_result(result)
+
+
+# Loads image regions rendered with render queue jobs
+# into the render result as soon as region job is done;
+# returns False if some region has failed
+#
+# @tiles - list of dicts: { 'job', 'region' : (x0, y0, x1, y1), 'files' : (candidate filepaths) }
+#
+@debug.TimeIt
+def LoadImageTiles(scene, engine, renderQueue, tiles):
+    resolution_y = int(scene.render.resolution_y * scene.render.resolution_percentage * 0.01)
+
+    loaded = set()
+
+    def loadFinishedTiles(rq):
+        for i, tile in enumerate(tiles):
+            if i in loaded or tile['job'].status != 'DONE':
+                continue
+            loaded.add(i)
+
+            x0, y0, x1, y1 = tile['region']
+
+            # Blender's result origin is at the bottom left corner
+            result = engine.begin_result(x0, resolution_y - y1, x1 - x0, y1 - y0)
             layer = result.layers[0]
             try:
-                if os.path.exists(imageFile):
-                    layer.load_from_file(imageFile)
-                elif engine.is_preview and os.path.exists(imageFilePreviewCompat):
-                    layer.load_from_file(imageFilePreviewCompat)
+                for imageFile in tile['files']:
+                    if os.path.exists(imageFile):
+                        layer.load_from_file(imageFile)
+                        break
             except Exception as e:
                 debug.Debug("Error loading file! [%s]" % e, msgType='ERROR')
-            if engine.test_break():
-                break
             engine.end_result(result)
-            break
-        time.sleep(0.001)
+
+            engine.update_progress(len(loaded) / len(tiles))
+
+        # Region is lost, no need to render the rest
+        if rq.getJobs('FAILED'):
+            rq.kill()
+
+        return False
+
+    return renderQueue.run(engine.test_break, loadFinishedTiles)
@@ -50,6 +50,11 @@ def ExportObjects(bus, exportNodes=True, exportMeshes=None):
     if VRayScene.VRayDR.on:
         exportMeshes = True
 
+    # Pipelined frames are exported into their own files
+    # (see ExportEx), so every frame needs its own geometry
+    if 'renderQueue' in bus:
+        exportMeshes = True
+
     # Finally export stuff
     exportGeometry = exportMeshes if exportMeshes is not None else VRayExporter.auto_meshes
 
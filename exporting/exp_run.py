@@ -22,12 +22,16 @@
 # All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
 #
 
+import copy
+import os
+
 import bpy
 
 from vb30.exporting.cloud_job import VCloudJob
 
 from vb30.lib.VRayProcess import VRayProcess
-from vb30.lib import SysUtils
+from vb30.lib.VRayRenderQueue import VRayRenderQueue
+from vb30.lib import SysUtils, VRayHostProbe
 
 from vb30 import debug
 
@@ -78,8 +82,9 @@ def Run(bus):
 
         p.setRegion(x0, y0, x1, y1, useCrop=scene.render.use_crop_to_border)
 
+    # NOTE: Process exit is waited by exp_load.LoadImage,
+    # so rendering could be cancelled and the image is loaded progressively
     if imageToBlender:
-        p.setWaitExit(True)
         p.setAutoclose(True)
 
     if engine.is_preview:
@@ -98,10 +103,28 @@ def Run(bus):
 
             p.setDistributed(2 if VRayDR.renderOnlyOnNodes else 1)
 
-            hosts = []
+            nodes = []
             for n in VRayDR.nodes:
                 if n.use:
-                    hosts.append("%s:%s" % (n.address,n.port) if n.port_override else n.address)
+                    nodes.append((n.address, n.port if n.port_override else VRayDR.port))
+
+            if VRayDR.probeHosts and nodes:
+                probe = VRayHostProbe.GetHostProbe(SysUtils.GetDRNodesHistoryFilepath())
+
+                aliveNodes = probe.select(nodes, VRayDR.probeTimeout, VRayDR.probeMaxLatency)
+                try:
+                    probe.save()
+                except OSError as e:
+                    debug.PrintError("Error saving render nodes history: %s" % e)
+
+                if aliveNodes:
+                    nodes = aliveNodes
+                else:
+                    debug.PrintError("None of the render nodes is reachable!")
+
+            hosts = []
+            for address, port in nodes:
+                hosts.append("%s:%s" % (address, port) if port != VRayDR.port else address)
 
             p.setRenderhosts(hosts)
             p.setPortNumber(VRayDR.port)
@@ -123,7 +146,8 @@ def Run(bus):
         p.setThreads(scene.render.threads)
 
     if bpy.app.background or VRayExporter.wait:
-        p.setWaitExit(True)
+        if not imageToBlender:
+            p.setWaitExit(True)
         if bpy.app.background:
             if not VRayExporter.display_vfb_in_batch:
                 p.setDisplayVFB(False) # Disable VFB
@@ -135,6 +159,16 @@ def Run(bus):
     if VRayExporter.submit_to_vray_cloud:
         p.setAutorun(False)
 
+    # Process will be started by the frame pipeline
+    if 'renderQueue' in bus:
+        bus['renderQueue'].append(p)
+        return
+
+    if imageToBlender and VRayExporter.split_render and VRayExporter.split_render_regions > 1:
+        if not (engine.is_preview or VRayDR.on or VRayExporter.submit_to_vray_cloud) and p.autorun:
+            RunSplit(bus, p)
+            return
+
     exportExitStatus = p.run()
 
     if exportExitStatus == 0 and VRayExporter.submit_to_vray_cloud:
@@ -148,6 +182,87 @@ def Run(bus):
         exp_load.LoadImage(scene, engine, o, p)
 
 
+# Returns (x0, y0, x1, y1) regions splitting image into horizontal bands
+#
+def GetSplitRegions(resolution_x, resolution_y, regionsCount):
+    regionsCount = min(regionsCount, resolution_y)
+
+    regions = []
+    for i in range(regionsCount):
+        y0 = resolution_y *  i    // regionsCount
+        y1 = resolution_y * (i+1) // regionsCount
+        regions.append((0, y0, resolution_x, y1))
+
+    return regions
+
+
+# Inserts tile suffix after the image file name,
+# before the frame number and extension
+#
+def GetTileFilename(filename, baseNameLength, tileIndex):
+    return "%s_tile%02i%s" % (filename[:baseNameLength], tileIndex, filename[baseNameLength:])
+
+
+# Renders image regions with separate processes
+# and loads them back into Blender
+#
+def RunSplit(bus, p):
+    scene  = bus['scene']
+    engine = bus['engine']
+    o      = bus['output']
+
+    VRayScene    = scene.vray
+    VRayExporter = VRayScene.Exporter
+
+    pm = o.getFileManager().getPathManager()
+
+    resolution_x = int(scene.render.resolution_x * scene.render.resolution_percentage * 0.01)
+    resolution_y = int(scene.render.resolution_y * scene.render.resolution_percentage * 0.01)
+
+    regions = GetSplitRegions(resolution_x, resolution_y, VRayExporter.split_render_regions)
+
+    rq = VRayRenderQueue()
+    rq.setMaxParallel(len(regions))
+    rq.setRetries(VRayExporter.render_retries)
+
+    # Split CPU threads between regions
+    if scene.render.threads_mode == 'AUTO':
+        rq.setThreads(os.cpu_count() or 1)
+    else:
+        rq.setThreads(scene.render.threads)
+
+    imgDirpath      = pm.getImgDirpath()
+    imgFilename     = pm.getImgFilename()
+    imgLoadFilepath = pm.getImgLoadFilepath()
+
+    baseNameLength = len(os.path.splitext(imgFilename)[0])
+
+    tiles = []
+    for i, region in enumerate(regions):
+        tp = copy.copy(p)
+        tp.setRegion(*region, useCrop=True)
+        tp.setOutputFile(os.path.join(imgDirpath, GetTileFilename(imgFilename, baseNameLength, i)))
+        tp.setDisplayVFB(False)
+        tp.setAutoclose(True)
+
+        job = rq.addJob(tp, "Region %i" % i)
+
+        tiles.append({
+            'job'    : job,
+            'region' : region,
+            'files'  : (
+                os.path.join(imgDirpath, GetTileFilename(os.path.basename(imgLoadFilepath), baseNameLength, i)),
+                tp.imgFile,
+            ),
+        })
+
+    if not exp_load.LoadImageTiles(scene, engine, rq, tiles):
+        if not engine.test_break():
+            # Jobs killed after the failure have no exit code
+            failedJobs = [job.name for job in rq.getJobs('FAILED') if job.exitCode]
+            raise Exception("Error rendering image regions: %s" % ", ".join(failedJobs))
+
+
 def RunEx(bus):
     debug.Debug("RunEx()")
 
@@ -90,6 +90,10 @@ def ExportSettingsPlugin(bus, pluginType, pluginName):
     if not propGroup:
         return
 
+    # Read all parameters at once
+    if hasattr(pluginModule, 'PluginParams'):
+        propGroup = ExportUtils.GetSnapshot(bus, pluginModule, propGroup)
+
     ExportUtils.WritePlugin(bus, pluginModule, pluginName, propGroup, overrideParams)
 
 
@@ -55,6 +55,15 @@ SkippedTypes = {
     'STRING_LIST',
 }
 
+# Skipped list types that could be exported from a manually
+# defined value (see LibUtils.FormatList)
+ListTypes = {
+    'INT_LIST'    : 'Int',
+    'FLOAT_LIST'  : 'Float',
+    'VECTOR_LIST' : 'Vector',
+    'COLOR_LIST'  : 'Color',
+}
+
 InputTypes = {
     'BRDF',
     'INT_TEXTURE',
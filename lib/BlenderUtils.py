@@ -115,6 +115,29 @@ def IsDataAnimated(o):
     return False
 
 
+# Checks if ID block has any fcurves or drivers
+# @dataPaths - tuple of data path prefixes to check,
+#              any path is checked if None
+#
+def HasAnimationCurves(o, dataPaths=None):
+    animData = o.animation_data
+    if not animData:
+        return False
+
+    fcurves = list(animData.drivers)
+    if animData.action:
+        fcurves.extend(animData.action.fcurves)
+
+    if dataPaths is None:
+        return len(fcurves) > 0
+
+    for fcurve in fcurves:
+        if fcurve.data_path.startswith(dataPaths):
+            return True
+
+    return False
+
+
 def GetObjectList(object_names_string=None, group_names_string=None):
     object_list = []
 
@@ -22,46 +22,192 @@
 # All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
 #
 
+import operator
 import os
 
 import bpy
 
 from vb30.debug import Debug, PrintDict
 
-from . import AttributeUtils, PathUtils, BlenderUtils
+from . import AttributeUtils, PathUtils, BlenderUtils, LibUtils
 
 
-def WritePluginParams(bus, pluginModule, pluginName, propGroup, mappedParams):
-    scene = bus['scene']
-    o     = bus['output']
+# Precomputed parameter export plans
+# { pluginModule : [(attrName, handling, mappedOnly, listType), ...] }
+#
+# handling:
+#   'AS_IS'     - write value as is
+#   'VALUE'     - write value
+#   'NOT_EMPTY' - write value if it's not empty
+#   'LIST'      - format list value if it's not already formatted
+#   'STRING'    - write quoted string if it's not empty
+#   'FILE_PATH' - same as 'STRING', but value is a file path
+#   'DIR_PATH'  - same as 'STRING', but value is a directory path
+#
+# mappedOnly - attribute is exported only if it's value is mapped
+#
+ExportPlans = {}
 
-    VRayScene = scene.vray
-    VRayDR    = VRayScene.VRayDR
 
-    if not hasattr(pluginModule, 'PluginParams'):
-        Debug("Module %s doesn't have PluginParams!" % pluginModule.ID, msgType='ERROR')
-        return
+def BuildExportPlan(pluginModule):
+    plan = []
 
     for attrDesc in sorted(pluginModule.PluginParams, key=lambda t: t['attr']):
         attrName = attrDesc['attr']
-        skip     = attrDesc.get('skip', False)
-
-        if skip and attrDesc['attr'] not in mappedParams:
-            continue
+        attrType = attrDesc['type']
 
         # Skip output attributes
-        if attrDesc['type'] in AttributeUtils.OutputTypes:
-            continue
-
-        # Type could be skipped, but mappedParams could contain a manually defined value for it
-        if attrDesc['type'] in AttributeUtils.SkippedTypes and attrDesc['attr'] not in mappedParams:
+        if attrType in AttributeUtils.OutputTypes:
             continue
 
+        # Type could be skipped, but mappedParams could contain a manually defined value for it.
         # Skip attibutes that should be mapped, but are not mapped,
         # we will use parameter value then
-        if attrDesc['type'] in AttributeUtils.InputTypes and attrDesc['attr'] not in mappedParams:
-            continue
+        mappedOnly = attrDesc.get('skip', False) or \
+                     attrType in AttributeUtils.SkippedTypes or \
+                     attrType in AttributeUtils.InputTypes
+
+        listType = None
+
+        if 'EXPORT_AS_IS' in attrDesc.get('options', ()):
+            handling = 'AS_IS'
+        elif attrType in AttributeUtils.PluginTypes or attrType in {'TRANSFORM', 'MATRIX', 'VECTOR'}:
+            handling = 'NOT_EMPTY'
+        elif attrType in AttributeUtils.ListTypes:
+            handling = 'LIST'
+            listType = AttributeUtils.ListTypes[attrType]
+        elif attrType in {'STRING'}:
+            handling = 'STRING'
+            subtype = attrDesc.get('subtype')
+            if subtype in {'FILE_PATH', 'DIR_PATH'}:
+                handling = subtype
+        else:
+            handling = 'VALUE'
+
+        plan.append((attrName, handling, mappedOnly, listType))
+
+    ExportPlans[pluginModule] = plan
+
+    return plan
+
+
+def BuildExportPlans(pluginModules):
+    for pluginID in pluginModules:
+        pluginModule = pluginModules[pluginID]
+        if hasattr(pluginModule, 'PluginParams'):
+            BuildExportPlan(pluginModule)
+
+
+def GetExportPlan(pluginModule):
+    plan = ExportPlans.get(pluginModule)
+    if plan is None:
+        plan = BuildExportPlan(pluginModule)
+    return plan
+
+
+# Property group values snapshots
+# Kept between exports only while KeepSnapshots is on
+# (f.e. while rendering animation frame by frame)
+#
+# { (pluginID, propGroup pointer) : { attrName : value } }
+#
+Snapshots = {}
+KeepSnapshots = False
+
+
+def SetKeepSnapshots(keep):
+    global KeepSnapshots
+    KeepSnapshots = keep
+    Snapshots.clear()
+
+
+# Wraps property group: attributes from the snapshot
+# are plain instance attributes, anything else is
+# read from the property group itself
+#
+class PropGroupSnapshot:
+    def __init__(self, propGroup, values):
+        self.__dict__.update(values)
+        self.__dict__['_propGroup'] = propGroup
+
+    def __getattr__(self, name):
+        return getattr(self._propGroup, name)
+
+    def __contains__(self, key):
+        return key in self._propGroup
 
+
+# Returns the names of scene.vray property groups
+# animated with fcurves or drivers
+#
+def GetAnimatedGroups(bus):
+    cache = bus.get('cache', {})
+    if 'animated' in cache:
+        return cache['animated']
+
+    animated = set()
+
+    animData = bus['scene'].animation_data
+    if animData:
+        fcurves = list(animData.drivers)
+        if animData.action:
+            fcurves.extend(animData.action.fcurves)
+        for fcurve in fcurves:
+            dataPath = fcurve.data_path.split('.')
+            if len(dataPath) > 2 and dataPath[0] == 'vray':
+                animated.add(dataPath[1])
+
+    cache['animated'] = animated
+
+    return animated
+
+
+# Reads all exported parameters of the property group at once;
+# snapshot is reused while group is not animated
+#
+def GetSnapshot(bus, pluginModule, propGroup):
+    key = (pluginModule.ID, propGroup.as_pointer())
+
+    isAnimated = pluginModule.ID in GetAnimatedGroups(bus)
+
+    values = None
+    if not isAnimated:
+        values = Snapshots.get(key)
+
+    if values is None:
+        properties = propGroup.bl_rna.properties
+        attrNames  = [attrName for attrName, handling, mappedOnly, listType in GetExportPlan(pluginModule)
+                      if not mappedOnly and handling != 'AS_IS' and attrName in properties]
+
+        values = {}
+        if attrNames:
+            attrValues = operator.attrgetter(*attrNames)(propGroup)
+            if len(attrNames) == 1:
+                attrValues = (attrValues,)
+            for attrName, value in zip(attrNames, attrValues):
+                # Vectors and colors are bound to the property, make a copy
+                if hasattr(value, 'copy'):
+                    value = value.copy()
+                values[attrName] = value
+
+        if KeepSnapshots and not isAnimated:
+            Snapshots[key] = values
+
+    return PropGroupSnapshot(propGroup, values)
+
+
+def WritePluginParams(bus, pluginModule, pluginName, propGroup, mappedParams):
+    scene = bus['scene']
+    o     = bus['output']
+
+    VRayScene = scene.vray
+    VRayDR    = VRayScene.VRayDR
+
+    if not hasattr(pluginModule, 'PluginParams'):
+        Debug("Module %s doesn't have PluginParams!" % pluginModule.ID, msgType='ERROR')
+        return
+
+    for attrName, handling, mappedOnly, listType in GetExportPlan(pluginModule):
         value = None
 
         if attrName in mappedParams:
@@ -72,10 +218,12 @@ def WritePluginParams(bus, pluginModule, pluginName, propGroup, mappedParams):
             if value is None:
                 continue
 
-        if 'options' in attrDesc:
-            if 'EXPORT_AS_IS' in attrDesc['options']:
-                o.writeAttibute(attrName, value)
-                continue
+        elif mappedOnly:
+            continue
+
+        if handling == 'AS_IS':
+            o.writeAttibute(attrName, value)
+            continue
 
         if value is None:
             value = getattr(propGroup, attrName)
@@ -84,27 +232,32 @@ def WritePluginParams(bus, pluginModule, pluginName, propGroup, mappedParams):
             Debug("%s.%s value is None!" % (pluginName, attrName), msgType='ERROR')
             continue
 
-        if attrDesc['type'] in AttributeUtils.PluginTypes and not value:
-            continue
+        if handling == 'VALUE':
+            pass
 
-        if attrDesc['type'] in {'TRANSFORM', 'MATRIX', 'VECTOR'}:
+        elif handling == 'NOT_EMPTY':
             if not value:
                 continue
 
-        if attrDesc['type'] in {'STRING'}:
+        elif handling == 'LIST':
+            # List could be passed as already formatted string
+            if type(value) is not str:
+                useHex = VRayScene.Exporter.data_format != 'ASCII'
+                value = LibUtils.FormatList(value, listType, useHex)
+
+        else:
             if not value:
                 continue
 
-            subtype = attrDesc.get('subtype')
-            if subtype in {'FILE_PATH', 'DIR_PATH'}:
+            if handling in {'FILE_PATH', 'DIR_PATH'}:
                 value = BlenderUtils.GetFullFilepath(value)
 
-                if subtype == 'FILE_PATH':
+                if handling == 'FILE_PATH':
                     if VRayDR.on:
                         if VRayDR.assetSharing == 'SHARE':
                             value = PathUtils.CopyDRAsset(bus, value)
 
-                elif subtype == 'DIR_PATH':
+                elif handling == 'DIR_PATH':
                     # Ensure slash at the end of directory path
                     value = os.path.normpath(value) + os.sep
 
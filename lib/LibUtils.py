@@ -23,14 +23,25 @@
 #
 
 import re
+import array
+import binascii
 import datetime
 import struct
+import sys
 import uuid
 
 import bpy
 import mathutils
 
-import _vray_for_blender
+try:
+    import _vray_for_blender
+except ImportError:
+    _vray_for_blender = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 from . import PathUtils
 
@@ -106,38 +117,180 @@ def CleanString(s, stripSigns=True):
     return s
 
 
-# Return value in .vrscene format
+# Returns True if transforms should be exported in plain text
+# instead of the hex format
 #
-def FormatValue(t, subtype=None, quotes=False, ascii=False):
-    if type(t) is bool:
-        return "%i"%(t)
-    elif type(t) is int:
-        return "%i"%(t)
-    elif type(t) is float:
-        return "%.6g"%(t)
-    elif type(t) is mathutils.Matrix:
-        if len(t.col) == 4:
-            if ascii or bpy.context.scene.render.engine == 'VRAY_RENDER_RT':
-                return "Transform(Matrix(Vector(%.6g,%f,%f),Vector(%.6g,%.6g,%.6g),Vector(%.6g,%.6g,%.6g)),Vector(%.12f,%.12f,%.12f))" % (t[0][0], t[1][0], t[2][0], t[0][1], t[1][1], t[2][1], t[0][2], t[1][2], t[2][2], t[0][3], t[1][3], t[2][3])
-            return _vray_for_blender.getTransformHex(t.copy())
-        else:
-            return "Matrix(Vector(%.6g,%f,%f),Vector(%.6g,%.6g,%.6g),Vector(%.6g,%.6g,%.6g))" % (t[0][0], t[1][0], t[2][0], t[0][1], t[1][1], t[2][1], t[0][2], t[1][2], t[2][2])
-    elif type(t) is mathutils.Vector:
-        return "Vector(%.3g,%.3g,%.3g)" % (t.x,t.y,t.z)
-    elif type(t) is mathutils.Color:
-        if subtype:
-            return "AColor(%.3g,%.3g,%.3g,1.0)" % (t.r,t.g,t.b)
-        return "Color(%.3g,%.3g,%.3g)" % (t.r,t.g,t.b)
-    elif type(t) is str:
-        if t == "True":
-            return "1"
-        if t == "False":
-            return "0"
+def UseAsciiTransform():
+    return bpy.context.scene.render.engine == 'VRAY_RENDER_RT'
+
+
+TransformFormat = "Transform(Matrix(Vector(%.6g,%f,%f),Vector(%.6g,%.6g,%.6g),Vector(%.6g,%.6g,%.6g)),Vector(%.12f,%.12f,%.12f))"
+MatrixFormat    = "Matrix(Vector(%.6g,%f,%f),Vector(%.6g,%.6g,%.6g),Vector(%.6g,%.6g,%.6g))"
+
+
+# Hex encoded binary data in .vrscene format: bytes as is
+# (little-endian 32 bit floats / 64 bit doubles) in uppercase hex
+#
+def GetHex(data):
+    return binascii.hexlify(data).upper().decode('ascii')
+
+
+def GetMatrixHex(t):
+    return 'MatrixHex("%s")' % GetHex(struct.pack('<9f',
+        t[0][0], t[1][0], t[2][0],
+        t[0][1], t[1][1], t[2][1],
+        t[0][2], t[1][2], t[2][2]))
+
+
+def GetTransformHex(t):
+    if _vray_for_blender is not None:
+        return _vray_for_blender.getTransformHex(t.copy())
+
+    # Same memory layout as the native transform: float matrix by columns,
+    # 4 bytes of padding to align the double offset
+    return 'TransformHex("%s")' % GetHex(struct.pack('<9f4x3d',
+        t[0][0], t[1][0], t[2][0],
+        t[0][1], t[1][1], t[2][1],
+        t[0][2], t[1][2], t[2][2],
+        t[0][3], t[1][3], t[2][3]))
+
+
+def _formatInt(t, subtype, quotes, ascii):
+    return "%i"%(t)
+
+def _formatFloat(t, subtype, quotes, ascii):
+    return "%.6g"%(t)
+
+def _formatMatrix(t, subtype, quotes, ascii):
+    if len(t.col) == 4:
+        if ascii:
+            return TransformFormat % (t[0][0], t[1][0], t[2][0], t[0][1], t[1][1], t[2][1], t[0][2], t[1][2], t[2][2], t[0][3], t[1][3], t[2][3])
+        return GetTransformHex(t)
+    if ascii:
+        return MatrixFormat % (t[0][0], t[1][0], t[2][0], t[0][1], t[1][1], t[2][1], t[0][2], t[1][2], t[2][2])
+    return GetMatrixHex(t)
+
+def _formatVector(t, subtype, quotes, ascii):
+    return "Vector(%.3g,%.3g,%.3g)" % (t.x,t.y,t.z)
+
+def _formatColor(t, subtype, quotes, ascii):
+    if subtype:
+        return "AColor(%.3g,%.3g,%.3g,1.0)" % (t.r,t.g,t.b)
+    return "Color(%.3g,%.3g,%.3g)" % (t.r,t.g,t.b)
+
+def _formatString(t, subtype, quotes, ascii):
+    if t == "True":
+        return "1"
+    if t == "False":
+        return "0"
+    return _formatDefault(t, subtype, quotes, ascii)
+
+def _formatDefault(t, subtype, quotes, ascii):
     if quotes:
         return '"%s"' % t
     return t
 
 
+ValueFormatters = {
+    bool             : _formatInt,
+    int              : _formatInt,
+    float            : _formatFloat,
+    mathutils.Matrix : _formatMatrix,
+    mathutils.Vector : _formatVector,
+    mathutils.Color  : _formatColor,
+    str              : _formatString,
+}
+
+
+# Return value in .vrscene format
+#
+# @ascii - export transforms in plain text; if None it's
+#          resolved from the render engine on every call,
+#          so better resolve it once with UseAsciiTransform()
+#
+def FormatValue(t, subtype=None, quotes=False, ascii=None):
+    if ascii is None:
+        ascii = UseAsciiTransform()
+    return ValueFormatters.get(type(t), _formatDefault)(t, subtype, quotes, ascii)
+
+
+# Same as FormatValue, but for the list of values
+#
+def FormatValues(values, subtype=None, quotes=False, ascii=None):
+    if ascii is None:
+        ascii = UseAsciiTransform()
+    formatters = ValueFormatters
+    return [formatters.get(type(t), _formatDefault)(t, subtype, quotes, ascii) for t in values]
+
+
+# { List type : (items per element, array typecode, plain text element format) }
+ListFormats = {
+    'Int'    : (1, 'i', "%i"),
+    'Float'  : (1, 'f', "%.6g"),
+    'Vector' : (3, 'f', "Vector(%.6g,%.6g,%.6g)"),
+    'Color'  : (3, 'f', "Color(%.6g,%.6g,%.6g)"),
+}
+
+
+def _flattenList(values, itemSize):
+    if itemSize > 1 and len(values) and not isinstance(values[0], (int, float)):
+        return [c for v in values for c in v]
+    return values
+
+
+# Returns list data packed as little-endian 32 bit values
+#
+def PackList(values, listType):
+    itemSize, typecode, elemFormat = ListFormats[listType]
+
+    if numpy is not None:
+        dtype = '<i4' if typecode == 'i' else '<f4'
+        return numpy.asarray(values, dtype=dtype).tobytes()
+
+    data = array.array(typecode, _flattenList(values, itemSize))
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data.tobytes()
+
+
+# Return list value in .vrscene format
+#
+# @values   - flat list of numbers or a list of vectors / colors
+# @listType - one of ListFormats keys
+# @useHex   - export as hex encoded binary data
+#
+def FormatList(values, listType, useHex=False):
+    itemSize, typecode, elemFormat = ListFormats[listType]
+
+    if useHex:
+        return 'List%sHex("%s")' % (listType, GetHex(PackList(values, listType)))
+
+    if numpy is not None:
+        flat = numpy.asarray(values).reshape(-1).tolist()
+    else:
+        flat = _flattenList(values, itemSize)
+
+    elemCount = len(flat) // itemSize
+    if not elemCount:
+        return "List%s()" % listType
+
+    listFormat = ",".join([elemFormat] * elemCount)
+    return "List%s(%s)" % (listType, listFormat % tuple(flat))
+
+
+# Returns value components as a tuple of floats for values that
+# could be linearly interpolated or None otherwise
+#
+def GetNumericValue(t):
+    if type(t) is float:
+        return (t,)
+    elif type(t) in {mathutils.Vector, mathutils.Color}:
+        return tuple(t)
+    elif type(t) is mathutils.Matrix:
+        return tuple(v for row in t for v in row)
+    return None
+
+
 # This funciton will substitue special format sequences with
 # the correspondent values
 #
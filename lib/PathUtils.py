@@ -26,14 +26,15 @@ import os
 import sys
 import tempfile
 import pathlib
-import filecmp
 import shutil
+import concurrent.futures
 
 import bpy
 
 from vb30 import debug
 
 from . import SysUtils
+from .VRayAssetStore import VRayAssetStore, GetFileHash
 
 
 def GetFilename(filepath, ext=True):
@@ -83,19 +84,152 @@ def GetPreviewDir():
     return CreateDirectory(previewDir)
 
 
-def CopyTree(src, dst, symlinks=False, ignore=None):
-    if sys.platform == 'win32':
-        os.system('robocopy /E "%s" "%s"' % (src, dst))
-    else:
-        if not os.path.exists(dst):
-            os.makedirs(dst)
-        for item in os.listdir(src):
-            s = os.path.join(src, item)
-            d = os.path.join(dst, item)
-            if os.path.isdir(s):
-                shutil.copytree(s, d, symlinks, ignore)
+CopyBlockSize = 16 * 1024 * 1024
+
+
+# Copies file data using in-kernel copy where available
+#
+def CopyFileData(srcFilepath, dstFilepath):
+    with open(srcFilepath, 'rb') as fsrc, open(dstFilepath, 'wb') as fdst:
+        size   = os.fstat(fsrc.fileno()).st_size
+        offset = 0
+
+        if hasattr(os, 'copy_file_range'):
+            try:
+                while offset < size:
+                    n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), min(CopyBlockSize, size - offset), offset, offset)
+                    if n <= 0:
+                        break
+                    offset += n
+            except OSError:
+                pass
+
+        if offset < size and hasattr(os, 'sendfile') and sys.platform == 'linux':
+            try:
+                fdst.seek(offset)
+                while offset < size:
+                    n = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, min(CopyBlockSize, size - offset))
+                    if n <= 0:
+                        break
+                    offset += n
+            except OSError:
+                pass
+
+        if offset < size:
+            fsrc.seek(offset)
+            fdst.seek(offset)
+            shutil.copyfileobj(fsrc, fdst, CopyBlockSize)
+
+    # Keep modification time for the next sync
+    shutil.copystat(srcFilepath, dstFilepath)
+
+
+def IsFileSynced(srcEntry, dstFilepath, useHash):
+    try:
+        dstStat = os.stat(dstFilepath)
+    except OSError:
+        return False
+
+    srcStat = srcEntry.stat()
+
+    if srcStat.st_size != dstStat.st_size:
+        return False
+
+    # Some network file systems store time with 1-2 seconds precision
+    if abs(srcStat.st_mtime - dstStat.st_mtime) < 2.0:
+        return True
+
+    if useHash and GetFileHash(srcEntry.path) == GetFileHash(dstFilepath):
+        shutil.copystat(srcEntry.path, dstFilepath)
+        return True
+
+    return False
+
+
+# Synchronizes directory tree: copies only new and changed files
+#
+# @ignore  - same as for shutil.copytree()
+# @useHash - compare content of the files with the same size but different time
+# @workers - number of copy threads
+#
+# Returns report dict
+#
+# NOTE: Library function; nothing in the exporter distributes presets,
+# templates or assets to the nodes with it yet
+#
+def CopyTree(src, dst, symlinks=False, ignore=None, useHash=False, workers=4):
+    report = {
+        'copied'       : 0,
+        'copiedBytes'  : 0,
+        'skipped'      : 0,
+        'skippedBytes' : 0,
+        'errors'       : [],
+    }
+
+    def copyFile(srcEntry, dstFilepath):
+        size = srcEntry.stat().st_size
+        if IsFileSynced(srcEntry, dstFilepath, useHash):
+            return False, size
+        CopyFileData(srcEntry.path, dstFilepath)
+        return True, size
+
+    jobs = []
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        dirs = [(src, dst)]
+        while dirs:
+            srcDirpath, dstDirpath = dirs.pop()
+
+            try:
+                os.makedirs(dstDirpath, exist_ok=True)
+                entries = list(os.scandir(srcDirpath))
+            except OSError as e:
+                report['errors'].append('"%s": %s' % (srcDirpath, e))
+                continue
+
+            ignored = set()
+            if ignore is not None:
+                ignored = ignore(srcDirpath, [entry.name for entry in entries])
+
+            for entry in entries:
+                if entry.name in ignored:
+                    continue
+
+                dstPath = os.path.join(dstDirpath, entry.name)
+
+                if symlinks and entry.is_symlink():
+                    try:
+                        if os.path.lexists(dstPath):
+                            os.remove(dstPath)
+                        os.symlink(os.readlink(entry.path), dstPath)
+                    except OSError as e:
+                        report['errors'].append('"%s": %s' % (entry.path, e))
+                elif entry.is_dir():
+                    dirs.append((entry.path, dstPath))
+                else:
+                    jobs.append((entry.path, executor.submit(copyFile, entry, dstPath)))
+
+        for srcFilepath, future in jobs:
+            try:
+                copied, size = future.result()
+            except OSError as e:
+                report['errors'].append('"%s": %s' % (srcFilepath, e))
+                continue
+
+            if copied:
+                report['copied']      += 1
+                report['copiedBytes'] += size
             else:
-                shutil.copy2(s, d)
+                report['skipped']      += 1
+                report['skippedBytes'] += size
+
+    debug.Debug("Copied %i files (%i bytes), skipped %i files (%i bytes)" % (
+        report['copied'], report['copiedBytes'], report['skipped'], report['skippedBytes']))
+
+    for err in report['errors']:
+        debug.PrintError("Error copying %s" % err)
+
+    return report
 
 
 def CreateDirectory(directory):
@@ -117,6 +251,52 @@ def CreateDirectoryFromFilepath(filepath):
     return os.path.join(dirPath, fileName)
 
 
+# Asset store for the current export;
+# stored in bus to be saved at export end
+#
+def GetDRAssetStore(bus):
+    scene = bus['scene']
+
+    VRayScene = scene.vray
+    VRayDR    = VRayScene.VRayDR
+
+    cache = bus.get('cache')
+    if cache is not None and 'drAssetStore' in cache:
+        return cache['drAssetStore']
+
+    store = VRayAssetStore(CreateDirectory(bpy.path.abspath(VRayDR.shared_dir)))
+    store.setDeltaCopy(VRayDR.deltaCopy)
+    store.load()
+
+    if cache is not None:
+        # Copy in background while the rest of the scene is exported
+        store.setCopyThreads(VRayDR.copyThreads, VRayDR.copyRetries)
+        cache['drAssetStore'] = store
+
+    return store
+
+
+# Should be called once scene is exported and before render is started;
+# waits for asset copies, returns error message if some copy failed
+#
+def FinishDRAssets(bus):
+    cache = bus.get('cache')
+    if cache is None or 'drAssetStore' not in cache:
+        return None
+
+    store = cache.pop('drAssetStore')
+
+    errors = store.wait()
+    store.save()
+
+    if errors:
+        for err in errors:
+            debug.PrintError("Error copying asset %s" % err)
+        return "Error copying %i DR asset(s)!" % len(errors)
+
+    return None
+
+
 # @srcFilepath - full absolute path
 #
 def CopyDRAsset(bus, srcFilepath):
@@ -126,7 +306,6 @@ def CopyDRAsset(bus, srcFilepath):
     VRayDR    = VRayScene.VRayDR
 
     srcFilepath = os.path.normpath(srcFilepath)
-    dstRoot     = CreateDirectory(bpy.path.abspath(VRayDR.shared_dir))
 
     ExtToSubdir = {
         'ies'    : "ies",
@@ -141,12 +320,7 @@ def CopyDRAsset(bus, srcFilepath):
 
     srcFiletype = os.path.splitext(srcFilename)[1]
 
-    assetSubdir = ExtToSubdir.get(srcFiletype.lower(), "textures")
-
-    if assetSubdir:
-        dstRoot = CreateDirectory(os.path.join(dstRoot, assetSubdir))
-
-    dstFilepath = os.path.join(dstRoot, srcFilename)
+    assetSubdir = ExtToSubdir.get(srcFiletype.lstrip('.').lower(), "textures")
 
     if not os.path.exists(srcFilepath):
         # debug.PrintError('"%s" file does not exists!' % srcFilepath)
@@ -156,22 +330,19 @@ def CopyDRAsset(bus, srcFilepath):
         debug.PrintError('"%s" is not a file!' % srcFilepath)
         return srcFilepath
 
-    else:
-        if os.path.exists(dstFilepath):
-            if not filecmp.cmp(srcFilepath, dstFilepath):
-                debug.Debug('Copying "%s" to "%s"'% (debug.Color(srcFilename, 'magenta'), dstRoot))
+    store = GetDRAssetStore(bus)
 
-                shutil.copyfile(srcFilepath, dstFilepath)
-
-            else:
-                debug.Debug('File "%s" exists and not modified.'% debug.Color(srcFilename, 'magenta'))
-
-        else:
-            debug.Debug('Copying "%s" to "%s"' % (debug.Color(srcFilename, 'magenta'), dstRoot))
+    try:
+        assetPath = store.add(srcFilepath, assetSubdir)
+    except Exception as e:
+        debug.PrintError('Error copying "%s": %s' % (srcFilepath, e))
+        return srcFilepath
 
-            shutil.copyfile(srcFilepath, dstFilepath)
+    # Store is not kept between calls
+    if 'cache' not in bus:
+        store.save()
 
     if VRayDR.networkType == 'WW':
-        return pathlib.Path(r'\\') / SysUtils.GetHostname() / VRayDR.share_name / assetSubdir / srcFilename
+        return pathlib.Path(r'\\') / SysUtils.GetHostname() / VRayDR.share_name / assetPath
 
-    return dstFilepath
+    return os.path.join(store.rootDirpath, assetPath)
@@ -34,6 +34,8 @@ import bpy
 
 from vb30 import debug
 
+from . import VRayHostProbe
+
 
 def GetUsername():
     if sys.platform == 'win32':
@@ -221,6 +223,12 @@ def GetUserConfigDir():
     return userConfigDirpath
 
 
+# Render nodes probe history is kept next to the saved nodes list
+#
+def GetDRNodesHistoryFilepath():
+    return os.path.join(GetUserConfigDir(), VRayHostProbe.HistoryFilename)
+
+
 def GetVRsceneTemplate(filename):
     templatesDir = os.path.join(GetExporterPath(), "templates")
     templateFilepath = os.path.join(templatesDir, filename)
@@ -0,0 +1,361 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+import concurrent.futures
+
+from vb30 import debug
+
+
+ManifestFilename = "assets_manifest.json"
+ManifestVersion  = 2
+
+HashBlockSize = 1024 * 1024
+
+# Large assets that are often changed only partially
+# (proxies, light maps); updated in place with delta copy
+DeltaExtensions = {'.vrmesh', '.vrmap', '.vrst', '.vrsm'}
+DeltaBlockSize  = 1024 * 1024
+SignatureExt    = ".vrsig"
+SignatureVersion = 2
+
+
+def GetFileHash(filepath):
+    h = hashlib.sha1()
+    with open(filepath, 'rb') as f:
+        while True:
+            data = f.read(HashBlockSize)
+            if not data:
+                break
+            h.update(data)
+    return h.hexdigest()
+
+
+# Block signature of the destination file:
+# checksum (md5) of every block.
+# NOTE: Blocks are compared at the same offsets only (no rolling
+# search like in rsync), so a weak checksum would save nothing here:
+# every block has to be hashed anyway
+#
+def LoadSignature(dstFilepath, blockSize):
+    sigFilepath = dstFilepath + SignatureExt
+    try:
+        with open(sigFilepath, 'r') as f:
+            signature = json.load(f)
+        st = os.stat(dstFilepath)
+    except (OSError, ValueError):
+        return None
+
+    # File was changed not by us
+    if signature.get('version') != SignatureVersion or \
+       signature.get('blockSize') != blockSize or \
+       signature.get('size') != st.st_size or \
+       signature.get('mtime') != st.st_mtime:
+        return None
+
+    return signature['blocks']
+
+
+def SaveSignature(dstFilepath, blockSize, blocks):
+    st = os.stat(dstFilepath)
+
+    signature = {
+        'version'   : SignatureVersion,
+        'blockSize' : blockSize,
+        'size'      : st.st_size,
+        'mtime'     : st.st_mtime,
+        'blocks'    : blocks,
+    }
+
+    with open(dstFilepath + SignatureExt, 'w') as f:
+        json.dump(signature, f)
+
+
+# Updates destination file in place writing only the blocks
+# that differ from the destination signature;
+# returns number of bytes written
+#
+def DeltaCopy(srcFilepath, dstFilepath, blockSize=DeltaBlockSize):
+    prevBlocks = LoadSignature(dstFilepath, blockSize)
+
+    fmode = 'r+b' if prevBlocks is not None else 'wb'
+    if prevBlocks is None:
+        prevBlocks = []
+
+    blocks  = []
+    written = 0
+    size    = 0
+
+    with open(srcFilepath, 'rb') as src, open(dstFilepath, fmode) as dst:
+        while True:
+            data = src.read(blockSize)
+            if not data:
+                break
+
+            i = len(blocks)
+
+            blockHash = hashlib.md5(data).hexdigest()
+
+            if i >= len(prevBlocks) or prevBlocks[i] != blockHash:
+                dst.seek(size)
+                dst.write(data)
+                written += len(data)
+
+            blocks.append(blockHash)
+            size += len(data)
+
+        dst.truncate(size)
+
+    SaveSignature(dstFilepath, blockSize, blocks)
+
+    return written
+
+
+# Returns key of the source file version; uses only file state,
+# so the asset path is known without reading the file
+#
+def GetSourceKey(srcFilepath):
+    st = os.stat(srcFilepath)
+    sourceKey = "%s|%i|%i" % (srcFilepath, st.st_size, st.st_mtime_ns)
+    return hashlib.sha1(sourceKey.encode('utf-8')).hexdigest()
+
+
+# Asset storage:
+#   <root>/<subdir>/<source version key>/<file name>
+#
+# Asset path depends only on the source path, size and mtime,
+# so existing files are never read or copied again and files
+# with the same name but different content never collide.
+# Content is hashed only by the copy job (on the copy thread
+# when copy threads are set): manifest maps content hash
+# to the stored asset, so the same content is hard linked
+# instead of being copied again.
+#
+class VRayAssetStore:
+    def __init__(self, rootDirpath):
+        self.rootDirpath = rootDirpath
+
+        # { content hash : asset path }
+        self.contents = {}
+
+        # Delta copied assets are stored by source path
+        # { source filepath : [size, mtime] }
+        self.deltaSources = {}
+        self.deltaCopy    = False
+
+        self.lock     = threading.Lock()
+        self.modified = False
+
+        # Asynchronous copy
+        self.executor = None
+        self.pending  = {}
+        self.retries  = 0
+
+    # @threads - number of copy threads; 0 means copy synchronously
+    # @retries - number of copy retries on error
+    #
+    def setCopyThreads(self, threads, retries=0):
+        self.retries = retries
+        if threads > 0:
+            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=threads)
+
+    # Large assets will be updated in place with delta copy
+    # instead of storing every version by content
+    #
+    def setDeltaCopy(self, deltaCopy):
+        self.deltaCopy = deltaCopy
+
+    def useDeltaCopy(self, srcFilepath):
+        return self.deltaCopy and os.path.splitext(srcFilepath)[1].lower() in DeltaExtensions
+
+    def getManifestFilepath(self):
+        return os.path.join(self.rootDirpath, ManifestFilename)
+
+    def load(self):
+        manifestFilepath = self.getManifestFilepath()
+        if not os.path.exists(manifestFilepath):
+            return
+        try:
+            with open(manifestFilepath, 'r') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == ManifestVersion:
+                self.contents     = manifest['contents']
+                self.deltaSources = manifest.get('deltaSources', {})
+        except Exception as e:
+            debug.PrintError('Error reading asset manifest "%s": %s' % (manifestFilepath, e))
+
+    def save(self):
+        if not self.modified:
+            return
+
+        manifestFilepath = self.getManifestFilepath()
+        tmpFilepath = "%s.%i.tmp" % (manifestFilepath, os.getpid())
+
+        with self.lock:
+            manifest = {
+                'version' : ManifestVersion,
+                'contents' : self.contents,
+                'deltaSources' : self.deltaSources,
+            }
+            with open(tmpFilepath, 'w') as f:
+                json.dump(manifest, f)
+            self.modified = False
+
+        os.replace(tmpFilepath, manifestFilepath)
+
+    # Returns asset path relative to the store root
+    #
+    def getAssetPath(self, srcFilepath, subdir):
+        return os.path.join(subdir, GetSourceKey(srcFilepath), os.path.basename(srcFilepath))
+
+    # Copies file into the store if it's not there yet;
+    # returns asset path relative to the store root.
+    # If copy threads are set file is copied in background,
+    # use wait() to be sure all files are copied
+    #
+    def add(self, srcFilepath, subdir):
+        if self.useDeltaCopy(srcFilepath):
+            # Path depends only on the source path, so the previous
+            # version could be updated
+            sourceKey = hashlib.sha1(srcFilepath.encode('utf-8')).hexdigest()
+            assetPath = os.path.join(subdir, sourceKey, os.path.basename(srcFilepath))
+            copyFunc  = self.copyChanged
+        else:
+            assetPath = self.getAssetPath(srcFilepath, subdir)
+            copyFunc  = self.copyMissing
+
+        dstFilepath = os.path.join(self.rootDirpath, assetPath)
+
+        if self.executor is None:
+            copyFunc(srcFilepath, dstFilepath)
+
+        elif dstFilepath not in self.pending:
+            self.pending[dstFilepath] = self.executor.submit(copyFunc, srcFilepath, dstFilepath)
+
+        return assetPath
+
+    # Waits for the background copies;
+    # returns the list of errors
+    #
+    def wait(self):
+        errors = []
+
+        for dstFilepath, future in self.pending.items():
+            try:
+                future.result()
+            except Exception as e:
+                errors.append('"%s": %s' % (dstFilepath, e))
+
+        self.pending = {}
+
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+        return errors
+
+    def copyMissing(self, srcFilepath, dstFilepath):
+        if os.path.exists(dstFilepath):
+            debug.Debug('File "%s" exists and not modified.' % debug.Color(os.path.basename(srcFilepath), 'magenta'))
+            return
+
+        self.retry(self.copy, srcFilepath, dstFilepath)
+
+    def copyChanged(self, srcFilepath, dstFilepath):
+        st = os.stat(srcFilepath)
+
+        with self.lock:
+            entry = self.deltaSources.get(srcFilepath)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime and os.path.exists(dstFilepath):
+            debug.Debug('File "%s" exists and not modified.' % debug.Color(os.path.basename(srcFilepath), 'magenta'))
+            return
+
+        debug.Debug('Updating "%s" in "%s"' % (debug.Color(os.path.basename(srcFilepath), 'magenta'), os.path.dirname(dstFilepath)))
+
+        os.makedirs(os.path.dirname(dstFilepath), exist_ok=True)
+
+        written = self.retry(DeltaCopy, srcFilepath, dstFilepath)
+
+        debug.Debug('Written %i of %i bytes' % (written, st.st_size))
+
+        with self.lock:
+            self.deltaSources[srcFilepath] = [st.st_size, st.st_mtime]
+            self.modified = True
+
+    def retry(self, copyFunc, srcFilepath, dstFilepath):
+        attempt = 0
+        while True:
+            try:
+                return copyFunc(srcFilepath, dstFilepath)
+            except OSError as e:
+                if attempt >= self.retries:
+                    raise
+                attempt += 1
+                debug.Debug('Error copying "%s": %s; retrying...' % (srcFilepath, e))
+                time.sleep(0.5 * attempt)
+
+    # Hard links stored file with the same content;
+    # returns False if there is no such file or linking is not supported
+    #
+    def link(self, fileHash, dstFilepath):
+        with self.lock:
+            assetPath = self.contents.get(fileHash)
+        if assetPath is None:
+            return False
+
+        try:
+            os.link(os.path.join(self.rootDirpath, assetPath), dstFilepath)
+        except OSError:
+            return False
+
+        return True
+
+    # Copy with rename, so render nodes never see partially copied file
+    #
+    def copy(self, srcFilepath, dstFilepath):
+        dstDirpath = os.path.dirname(dstFilepath)
+
+        debug.Debug('Copying "%s" to "%s"' % (debug.Color(os.path.basename(srcFilepath), 'magenta'), dstDirpath))
+
+        os.makedirs(dstDirpath, exist_ok=True)
+
+        fileHash = GetFileHash(srcFilepath)
+
+        tmpFilepath = "%s.%i.%i.tmp" % (dstFilepath, os.getpid(), threading.get_ident())
+        try:
+            if not self.link(fileHash, tmpFilepath):
+                shutil.copyfile(srcFilepath, tmpFilepath)
+            os.replace(tmpFilepath, dstFilepath)
+        finally:
+            if os.path.exists(tmpFilepath):
+                os.remove(tmpFilepath)
+
+        with self.lock:
+            self.contents[fileHash] = os.path.relpath(dstFilepath, self.rootDirpath)
+            self.modified = True
@@ -0,0 +1,216 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+import os
+import json
+import time
+import socket
+import threading
+import concurrent.futures
+
+from vb30 import debug
+
+
+HistoryFilename = "render_nodes_history.json"
+HistoryVersion  = 1
+
+# Number of probe results kept for every host
+HistorySize = 10
+
+# Probe result is reused for this number of seconds,
+# so rendering animation frame by frame doesn't probe every frame
+ProbeCacheTime = 30.0
+
+# Probe used between exports
+ActiveProbe = None
+
+
+def GetHostKey(address, port):
+    return "%s:%i" % (address, port)
+
+
+# Returns connection time in milliseconds or None
+# if host is not reachable
+#
+def ProbeHost(address, port, timeout):
+    t = time.perf_counter()
+    try:
+        with socket.create_connection((address, port), timeout=timeout):
+            pass
+    except (OSError, ValueError):
+        return None
+    return (time.perf_counter() - t) * 1000.0
+
+
+# Returns probe with the history loaded from the file;
+# probe is kept while the history file is the same
+#
+def GetHostProbe(historyFilepath):
+    global ActiveProbe
+    if ActiveProbe is None or ActiveProbe.historyFilepath != historyFilepath:
+        ActiveProbe = VRayHostProbe(historyFilepath)
+        ActiveProbe.load()
+    return ActiveProbe
+
+
+# Checks render hosts reachability with concurrent TCP connects
+# and keeps latency / availability history
+#
+class VRayHostProbe:
+    def __init__(self, historyFilepath=None):
+        self.historyFilepath = historyFilepath
+
+        # { host key : [[probe time, latency or None], ...] }
+        self.history = {}
+
+        self.lock     = threading.Lock()
+        self.modified = False
+
+    def load(self):
+        if not self.historyFilepath or not os.path.exists(self.historyFilepath):
+            return
+        try:
+            with open(self.historyFilepath, 'r') as f:
+                history = json.load(f)
+            if history.get('version') == HistoryVersion:
+                self.history = history['hosts']
+        except Exception as e:
+            debug.PrintError('Error reading render nodes history "%s": %s' % (self.historyFilepath, e))
+
+    def save(self):
+        if not self.modified or not self.historyFilepath:
+            return
+
+        tmpFilepath = "%s.%i.tmp" % (self.historyFilepath, os.getpid())
+
+        with self.lock:
+            history = {
+                'version' : HistoryVersion,
+                'hosts'   : self.history,
+            }
+            with open(tmpFilepath, 'w') as f:
+                json.dump(history, f)
+            self.modified = False
+
+        os.replace(tmpFilepath, self.historyFilepath)
+
+    def addSample(self, key, latency, probeTime=None):
+        if probeTime is None:
+            probeTime = time.time()
+        with self.lock:
+            samples = self.history.setdefault(key, [])
+            samples.append([probeTime, latency])
+            del samples[:-HistorySize]
+            self.modified = True
+
+    def getLastSample(self, key):
+        samples = self.history.get(key)
+        if not samples:
+            return None
+        return samples[-1]
+
+    # Part of the probes host answered to
+    #
+    def getAvailability(self, key):
+        samples = self.history.get(key)
+        if not samples:
+            return 0.0
+        return sum(1 for probeTime, latency in samples if latency is not None) / len(samples)
+
+    # Average latency of the successful probes
+    #
+    def getLatency(self, key):
+        latencies = [latency for probeTime, latency in self.history.get(key, ()) if latency is not None]
+        if not latencies:
+            return None
+        return sum(latencies) / len(latencies)
+
+    # Probes hosts in parallel
+    #
+    # @hosts  - list of (address, port) tuples
+    # @maxAge - results not older than this are reused
+    #
+    # Returns { host key : latency or None }
+    #
+    def probe(self, hosts, timeout, maxAge=ProbeCacheTime):
+        now = time.time()
+
+        results = {}
+        toProbe = []
+        for address, port in hosts:
+            key = GetHostKey(address, port)
+            if key in results:
+                continue
+            lastSample = self.getLastSample(key)
+            if lastSample and now - lastSample[0] < maxAge:
+                results[key] = lastSample[1]
+            else:
+                results[key] = None
+                toProbe.append((key, address, port))
+
+        if toProbe:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(toProbe)) as executor:
+                futures = {executor.submit(ProbeHost, address, port, timeout) : key for key, address, port in toProbe}
+                for future in concurrent.futures.as_completed(futures):
+                    key = futures[future]
+                    results[key] = future.result()
+                    self.addSample(key, results[key], now)
+
+        return results
+
+    # Drops unreachable and slow hosts and orders the rest:
+    # hosts that were available more often go first,
+    # then the faster ones
+    #
+    # @hosts      - list of (address, port) tuples
+    # @maxLatency - latency limit in milliseconds; 0 means no limit
+    #
+    # Returns list of (address, port) tuples
+    #
+    def select(self, hosts, timeout, maxLatency=0, maxAge=ProbeCacheTime):
+        results = self.probe(hosts, timeout, maxAge)
+
+        selected = []
+        for address, port in hosts:
+            key = GetHostKey(address, port)
+            latency = results[key]
+
+            if latency is None:
+                debug.PrintInfo("Render node %s is not reachable; skipping" % key)
+                continue
+
+            if maxLatency and latency > maxLatency:
+                debug.PrintInfo("Render node %s is too slow (%.0f ms); skipping" % (key, latency))
+                continue
+
+            if (address, port) not in selected:
+                selected.append((address, port))
+
+        def rankKey(host):
+            key = GetHostKey(*host)
+            return (-self.getAvailability(key), self.getLatency(key))
+
+        selected.sort(key=rankKey)
+
+        return selected
@@ -302,6 +302,24 @@ class VRayProcess:
         self.process = None
 
 
+    # Waits for the process exit; returns True if process is not running
+    #
+    def wait(self, timeout=None):
+        if self.process is None:
+            return True
+        try:
+            self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return False
+        return True
+
+
+    def getExitCode(self):
+        if self.process is None:
+            return None
+        return self.process.poll()
+
+
     def is_running(self):
         if self.process is None:
             return False
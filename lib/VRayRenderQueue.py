@@ -0,0 +1,209 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+import os
+import time
+
+from vb30 import debug
+
+from .VRayProcess import VRayProcess
+
+
+# Queue currently processing jobs; used to show status in UI
+ActiveQueue = None
+
+
+class VRayRenderJob:
+    def __init__(self, process, name=None):
+        self.process  = process
+        self.name     = name if name else os.path.basename(process.sceneFile)
+
+        # 'QUEUED', 'RUNNING', 'DONE', 'FAILED'
+        self.status   = 'QUEUED'
+        self.attempts = 0
+        self.exitCode = None
+
+
+# Runs V-Ray processes with the limited number of
+# simultaneous renders
+#
+class VRayRenderQueue:
+    def __init__(self):
+        self.jobs = []
+
+        self.maxParallel = 1
+        self.numThreads  = 0
+        self.retries     = 0
+
+    def setMaxParallel(self, maxParallel):
+        self.maxParallel = max(1, maxParallel)
+
+    # Total number of threads shared between running jobs;
+    # 0 means V-Ray default (all threads) for every job
+    def setThreads(self, numThreads):
+        self.numThreads = numThreads
+
+    def setRetries(self, retries):
+        self.retries = retries
+
+    def addJob(self, process, name=None):
+        job = VRayRenderJob(process, name)
+        self.jobs.append(job)
+        return job
+
+    # Creates job from the scene file
+    #
+    # @frames - frame number or (start, end, step) tuple
+    # @region - (x0, y0, x1, y1) tuple
+    #
+    def addSceneJob(self, vrayCmd, sceneFile, frames=None, region=None, useCrop=False, name=None):
+        p = VRayProcess()
+        p.setVRayStandalone(vrayCmd)
+        p.setSceneFile(sceneFile)
+        p.setAutoclose(True)
+        p.setDisplayVFB(False)
+
+        if frames is not None:
+            if type(frames) is tuple:
+                p.setFrames(*frames)
+            else:
+                p.setFrames(frames)
+
+        if region is not None:
+            p.setRegion(*region, useCrop=useCrop)
+
+        return self.addJob(p, name)
+
+    def getJobs(self, status):
+        return [job for job in self.jobs if job.status == status]
+
+    def getStatus(self):
+        status = {
+            'QUEUED'  : 0,
+            'RUNNING' : 0,
+            'DONE'    : 0,
+            'FAILED'  : 0,
+        }
+        for job in self.jobs:
+            status[job.status] += 1
+        return status
+
+    def isDone(self):
+        for job in self.jobs:
+            if job.status in {'QUEUED', 'RUNNING'}:
+                return False
+        return True
+
+    def _getJobThreads(self):
+        if not self.numThreads:
+            return 0
+        return max(1, self.numThreads // self.maxParallel)
+
+    def _startJob(self, job):
+        job.attempts += 1
+        job.status = 'RUNNING'
+
+        p = job.process
+        p.setWaitExit(False)
+
+        numThreads = self._getJobThreads()
+        if numThreads:
+            p.setThreads(numThreads)
+
+        p.run()
+
+    # Checks finished jobs and starts the queued ones;
+    # doesn't block
+    #
+    def update(self):
+        running = 0
+
+        for job in self.jobs:
+            if job.status != 'RUNNING':
+                continue
+
+            if job.process.is_running():
+                running += 1
+                continue
+
+            job.exitCode = job.process.getExitCode()
+
+            if not job.exitCode:
+                job.status = 'DONE'
+            elif job.attempts <= self.retries:
+                debug.PrintInfo('Job "%s" failed with code %i; retrying...' % (job.name, job.exitCode))
+                self._startJob(job)
+                running += 1
+            else:
+                debug.PrintError('Job "%s" failed with code %i' % (job.name, job.exitCode))
+                job.status = 'FAILED'
+
+        for job in self.jobs:
+            if running >= self.maxParallel:
+                break
+            if job.status == 'QUEUED':
+                self._startJob(job)
+                running += 1
+
+    # Processes all jobs
+    #
+    # @testBreak - function returning True if rendering should be stopped
+    # @onUpdate  - function called with the queue on every status check;
+    #              should return True if it's going to add more jobs
+    #
+    def run(self, testBreak=None, onUpdate=None, interval=0.1):
+        global ActiveQueue
+        ActiveQueue = self
+
+        try:
+            while True:
+                if testBreak and testBreak():
+                    self.kill()
+                    break
+
+                self.update()
+
+                hasMoreJobs = False
+                if onUpdate:
+                    hasMoreJobs = onUpdate(self)
+
+                if hasMoreJobs:
+                    continue
+
+                if self.isDone():
+                    break
+
+                time.sleep(interval)
+        finally:
+            ActiveQueue = None
+
+        return len(self.getJobs('FAILED')) == 0
+
+    def kill(self):
+        for job in self.jobs:
+            if job.status == 'RUNNING':
+                job.process.kill()
+                job.status = 'FAILED'
+            elif job.status == 'QUEUED':
+                job.status = 'FAILED'
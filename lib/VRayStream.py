@@ -23,12 +23,24 @@
 #
 
 import bpy
-import mathutils
 
 import time
 import datetime
 import os
 import sys
+import gzip
+import bz2
+import zlib
+import hashlib
+import json
+import queue
+import socket
+import threading
+
+try:
+    import lzma
+except ImportError:
+    lzma = None
 
 from vb30.debug import Debug
 
@@ -57,6 +69,30 @@ NoAttrPlugins = {
     'FilterCatmullRom',
 }
 
+# Stream compressors could be used for *.vrscene files
+# { Type : (module, file extension) }
+Compressors = {
+    'GZIP'  : (gzip, ".gz"),
+    'BZIP2' : (bz2,  ".bz2"),
+}
+if lzma is not None:
+    Compressors['LZMA'] = (lzma, ".xz")
+
+# Cached attribute values of this length and longer
+# are stored compressed
+CachePackSize = 256
+
+# Cached values table is pruned when it grows over this size
+# (or twice the size after the last pruning)
+CacheValuesLimit = 64 * 1024
+
+# Default size of the collected data after which
+# it's flushed to the actual file
+DefaultBufferSize = 8 * 1024 * 1024
+
+# Max number of batches waiting for the writer thread
+DefaultWriteQueueSize = 4
+
 
 ########     ###    ######## ##     ##  ######
 ##     ##   ## ##      ##    ##     ## ##    ##
@@ -235,6 +271,289 @@ class VRayFilePaths:
 ##        ##  ##       ##       ##    ##
 ##       #### ######## ########  ######
 
+# Collects written data into a list of chunks and
+# writes it to the file in large batches.
+# Mimics file object interface, so could be passed
+# anywhere a file is expected (including the C++ exporter).
+#
+# If "encoding" is set file is expected to be opened in binary mode
+# and collected data is encoded once per flush.
+#
+class VRayFileBuffer:
+    def __init__(self, file, filepath, bufferSize=DefaultBufferSize, encoding=None):
+        self.file = file
+        self.name = filepath
+
+        self.bufferSize = bufferSize
+        self.encoding   = encoding
+
+        self.chunks     = []
+        self.chunksSize = 0
+
+    @property
+    def closed(self):
+        return self.file.closed
+
+    def write(self, data):
+        self.chunks.append(data)
+        self.chunksSize += len(data)
+        if self.chunksSize >= self.bufferSize:
+            self.flush()
+
+    def flush(self):
+        if self.chunks:
+            data = ''.join(self.chunks)
+            if self.encoding:
+                data = data.encode(self.encoding)
+            self.file.write(data)
+            self.chunks     = []
+            self.chunksSize = 0
+        if not self.file.closed:
+            self.file.flush()
+
+    def fileno(self):
+        self.flush()
+        return self.file.fileno()
+
+    def close(self):
+        if self.file.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self.file.close()
+
+
+# Used for the incremental export.
+# Data is hashed per written batch; batches matching the ones
+# from the previous export (stored in the index) are not written.
+# File is opened only on the first changed batch and written from
+# that batch offset, so unchanged files are not touched at all.
+#
+class VRayIncrementalFileBuffer(VRayFileBuffer):
+    def __init__(self, filepath, bufferSize=DefaultBufferSize, prevIndex=None):
+        VRayFileBuffer.__init__(self, None, filepath, bufferSize, encoding='utf-8')
+
+        self.prevBatches = []
+        self.prevSize    = 0
+
+        # Previous data could be reused only if file is not modified
+        # since the previous export; any difference means full rewrite
+        if prevIndex and os.path.isfile(filepath):
+            st = os.stat(filepath)
+            if st.st_size == prevIndex['size'] and st.st_mtime_ns == prevIndex.get('mtime'):
+                self.prevBatches = prevIndex['batches']
+                self.prevSize    = prevIndex['size']
+
+        self.batches  = []
+        self.size     = 0
+        self.isClosed = False
+
+    @property
+    def closed(self):
+        return self.isClosed
+
+    # NOTE: Called after close(), so the file state is final
+    #
+    def getIndex(self):
+        return {
+            'size'    : self.size,
+            'mtime'   : os.stat(self.name).st_mtime_ns,
+            'batches' : self.batches,
+        }
+
+    def _open(self):
+        if self.size:
+            self.file = open(self.name, 'r+b')
+            self.file.seek(self.size)
+        else:
+            self.file = open(self.name, 'wb')
+
+    def flush(self):
+        if not self.chunks:
+            return
+
+        data = ''.join(self.chunks).encode(self.encoding)
+        self.chunks     = []
+        self.chunksSize = 0
+
+        batchIndex  = len(self.batches)
+        batchDigest = hashlib.sha1(data).hexdigest()
+        self.batches.append(batchDigest)
+
+        if self.file is None:
+            if batchIndex < len(self.prevBatches) and self.prevBatches[batchIndex] == batchDigest:
+                self.size += len(data)
+                return
+            self._open()
+
+        self.file.write(data)
+        self.size += len(data)
+
+    def fileno(self):
+        self.flush()
+        if self.file is None:
+            self._open()
+        return self.file.fileno()
+
+    def close(self):
+        if self.isClosed:
+            return
+        self.isClosed = True
+        try:
+            self.flush()
+            if self.file is None:
+                # All data matches, but previous file could be longer
+                # (or there is no file at all for the empty data)
+                if self.size != self.prevSize or not os.path.exists(self.name):
+                    self._open()
+            if self.file is not None:
+                self.file.truncate()
+        finally:
+            if self.file is not None:
+                self.file.close()
+
+
+# Collects data like VRayFileBuffer, but batches are written
+# to the wrapped buffer from the background thread, so data
+# formatting overlaps with the disk I/O.
+# Write errors are raised on the next write / flush / close.
+#
+class VRayAsyncFileBuffer:
+    def __init__(self, buffer, queueSize=DefaultWriteQueueSize):
+        self.buffer = buffer
+        self.name   = buffer.name
+
+        self.chunks     = []
+        self.chunksSize = 0
+
+        self.error    = None
+        self.isClosed = False
+
+        self.queue  = queue.Queue(maxsize=queueSize)
+        self.thread = threading.Thread(target=self._writer, name="VRayWriter:%s" % os.path.basename(self.name))
+        self.thread.daemon = True
+        self.thread.start()
+
+    @property
+    def closed(self):
+        return self.isClosed
+
+    def _writer(self):
+        while True:
+            chunks = self.queue.get()
+            try:
+                if chunks is None:
+                    break
+                if self.error is None:
+                    self.buffer.write(''.join(chunks))
+                    self.buffer.flush()
+            except Exception as e:
+                self.error = e
+            finally:
+                self.queue.task_done()
+
+    def _checkError(self):
+        if self.error is not None:
+            raise self.error
+
+    def _queueChunks(self):
+        if self.chunks:
+            self.queue.put(self.chunks)
+            self.chunks     = []
+            self.chunksSize = 0
+
+    def write(self, data):
+        self.chunks.append(data)
+        self.chunksSize += len(data)
+        if self.chunksSize >= self.buffer.bufferSize:
+            self._checkError()
+            self._queueChunks()
+
+    def flush(self):
+        self._queueChunks()
+        self.queue.join()
+        self._checkError()
+
+    def fileno(self):
+        self.flush()
+        return self.buffer.fileno()
+
+    def close(self):
+        if self.isClosed:
+            return
+        self.isClosed = True
+        self._queueChunks()
+        self.queue.put(None)
+        self.thread.join()
+        # Wrapped buffer is closed even if some batch has failed,
+        # so the file handle is not leaked
+        try:
+            self._checkError()
+        finally:
+            self.buffer.close()
+
+
+# Output sinks
+# Anything with write() / flush() / close() / closed / name
+# could be used as output; these are used instead of files.
+#
+
+# Collects data in memory
+#
+class VRayMemorySink:
+    def __init__(self, name="memory"):
+        self.name   = name
+        self.chunks = []
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def getvalue(self):
+        return ''.join(self.chunks)
+
+
+# Streams data to a local socket
+#
+# @address - (host, port) for TCP or filepath for Unix domain socket
+#
+class VRaySocketSink:
+    def __init__(self, address, name=None):
+        self.name   = name if name else str(address)
+        self.closed = False
+
+        if isinstance(address, str):
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.connect(address)
+        else:
+            self.socket = socket.create_connection(address)
+
+    # NOTE: Expects encoded data; wrap into VRayFileBuffer
+    # with encoding set to write strings
+    def write(self, data):
+        self.socket.sendall(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.socket.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+        self.socket.close()
+
+
 class VRayExportFiles:
     def __init__(self, pm):
         # Paths manager
@@ -262,6 +581,27 @@ class VRayExportFiles:
         # Use this prefix instead of directory path
         self.explicitPrefix = None
 
+        # Data is written to files in batches of this size
+        self.bufferSize = DefaultBufferSize
+
+        # Open files in binary mode and encode data on flush
+        self.binaryMode = False
+
+        # Compress files of these types with the selected compressor
+        self.compression     = None
+        self.compressedTypes = set()
+
+        # Write only the data changed since the previous export
+        self.incremental = False
+        self.index       = {}
+
+        # Write files from background threads
+        self.threadedWrite = False
+
+        # Output sink type: 'FILE', 'MEMORY' or 'SOCKET'
+        self.sinkType    = 'FILE'
+        self.sinkAddress = None
+
     def setSeparateFiles(self, separateFiles):
         self.setSeparateFiles = separateFiles
 
@@ -277,18 +617,89 @@ class VRayExportFiles:
     def setPrefix(self, prefix):
         self.explicitPrefix = prefix
 
+    def setBufferSize(self, bufferSize):
+        self.bufferSize = bufferSize
+
+    def setBinaryMode(self, binaryMode):
+        self.binaryMode = binaryMode
+
+    def setCompression(self, compression, fileTypes):
+        self.compression     = compression if compression in Compressors else None
+        self.compressedTypes = set(fileTypes)
+
+    def setIncremental(self, incremental):
+        self.incremental = incremental
+
+    def setThreadedWrite(self, threadedWrite):
+        self.threadedWrite = threadedWrite
+
+    # NOTE: Socket sink streams everything into the single connection,
+    # so separate files are not used
+    def setSink(self, sinkType, address=None):
+        self.sinkType    = sinkType
+        self.sinkAddress = address
+        if sinkType == 'SOCKET':
+            self.separateFiles = False
+
+    def getIndexFilepath(self):
+        return os.path.join(self.exportDir, "%s.vrscene.index" % self.baseName)
+
+    def loadIndex(self):
+        self.index = {}
+
+        indexFilepath = self.getIndexFilepath()
+        if not os.path.exists(indexFilepath):
+            return
+
+        try:
+            with open(indexFilepath, 'r') as f:
+                self.index = json.load(f)
+        except Exception as e:
+            Debug("Error loading export index: %s" % e, msgType='ERROR')
+
+    def saveIndex(self):
+        index = {}
+        for fileType in self.files:
+            f = self.files[fileType]
+            if isinstance(f, VRayAsyncFileBuffer):
+                f = f.buffer
+            if isinstance(f, VRayIncrementalFileBuffer):
+                index[os.path.basename(f.name)] = f.getIndex()
+
+        with open(self.getIndexFilepath(), 'w') as f:
+            json.dump(index, f)
+
+    def removeIndex(self):
+        indexFilepath = self.getIndexFilepath()
+        if os.path.exists(indexFilepath):
+            os.remove(indexFilepath)
+
+    def getCompressor(self, fileType):
+        if not self.compression or fileType not in self.compressedTypes:
+            return None
+        return Compressors[self.compression]
+
+    def getFileExt(self, fileType):
+        compressor = self.getCompressor(fileType)
+        if compressor:
+            return ".vrscene%s" % compressor[1]
+        return ".vrscene"
+
     def getPathManager(self):
         return self.pm
 
     def init(self, doOpen=True):
         self.files = {}
 
+        if self.incremental and doOpen:
+            self.loadIndex()
+
         if not self.separateFiles:
-            filename = "%s.vrscene" % self.baseName
+            filename = "%s%s" % (self.baseName, self.getFileExt('scene'))
             filepath = os.path.join(self.exportDir, filename)
 
             if doOpen:
-                self.files['scene'] = open(filepath, 'w')
+                self.files['scene'] = self.openFile(filepath, 'w', 'scene')
             self.filePaths['scene'] = os.path.abspath(os.path.normpath(filepath))
         else:
             for pluginType in PluginTypeToFile:
@@ -296,7 +707,7 @@ class VRayExportFiles:
                 if fileType in self.filePaths:
                     continue
 
-                filename = "%s_%s.vrscene" % (self.baseName, fileType)
+                filename = "%s_%s%s" % (self.baseName, fileType, self.getFileExt(fileType))
                 filepath = os.path.join(self.exportDir, filename)
 
                 fmode = 'w'
@@ -304,7 +715,7 @@ class VRayExportFiles:
                     fmode = 'r'
 
                 if doOpen:
-                    self.files[fileType] = open(filepath, fmode)
+                    self.files[fileType] = self.openFile(filepath, fmode, fileType)
                 self.filePaths[fileType] = os.path.abspath(os.path.normpath(filepath))
 
         self.writeHeaders()
@@ -312,6 +723,43 @@ class VRayExportFiles:
         return None
 
 
+    def openFile(self, filepath, fmode, fileType):
+        f = self._openFile(filepath, fmode, fileType)
+        # Memory sink has no I/O to overlap with
+        if self.threadedWrite and fmode != 'r' and self.sinkType != 'MEMORY':
+            return VRayAsyncFileBuffer(f)
+        return f
+
+
+    def _openFile(self, filepath, fmode, fileType):
+        if self.sinkType == 'MEMORY':
+            return VRayMemorySink(filepath)
+        elif self.sinkType == 'SOCKET':
+            sink = VRaySocketSink(self.sinkAddress, filepath)
+            return VRayFileBuffer(sink, filepath, self.bufferSize, encoding='utf-8')
+
+        compressor = self.getCompressor(fileType)
+
+        if self.incremental and fmode == 'w' and not compressor:
+            prevIndex = self.index.get(os.path.basename(filepath))
+            return VRayIncrementalFileBuffer(filepath, self.bufferSize, prevIndex)
+
+        encoding = None
+        if self.binaryMode:
+            encoding = 'utf-8'
+            if compressor:
+                f = compressor[0].open(filepath, fmode + 'b')
+            else:
+                f = open(filepath, fmode + 'b', buffering=self.bufferSize)
+        else:
+            if compressor:
+                f = compressor[0].open(filepath, fmode + 't')
+            else:
+                f = open(filepath, fmode)
+
+        return VRayFileBuffer(f, filepath, self.bufferSize, encoding)
+
+
     def writeHeaders(self):
         if not self.files:
             return
@@ -319,9 +767,10 @@ class VRayExportFiles:
         for fileType in self.files:
             if fileType == 'geometry' and not self.overwriteGeometry:
                 continue
-            import _vray_for_blender_rt
             self.files[fileType].write("// V-Ray For Blender\n")
-            self.files[fileType].write("// %s\n" % datetime.datetime.now().strftime("%A, %d %B %Y %H:%M"))
+            # Export time will make every file differ from the previous export
+            if not self.incremental:
+                self.files[fileType].write("// %s\n" % datetime.datetime.now().strftime("%A, %d %B %Y %H:%M"))
             self.files[fileType].write("// Buils hash [%s]\n" % bpy.app.build_hash)
             self.files[fileType].write("\n")
 
@@ -358,17 +807,44 @@ class VRayExportFiles:
         for fileType in self.files:
             f = self.files[fileType]
             if f and f.closed:
-                self.files[fileType] = open(os.path.abspath(f.name), 'a')
+                self.files[fileType] = self.openFile(os.path.abspath(f.name), 'a', fileType)
+
+
+    def flush(self):
+        if not self.files:
+            return
+        for fileType in self.files:
+            f = self.files[fileType]
+            if f and not f.closed:
+                f.flush()
 
 
     def closeFiles(self):
         Debug("VRayExportFiles::closeFiles()")
         if not self.files:
             return
+        # Close all files even if some write has failed;
+        # report the first error
+        error = None
         for fileType in self.files:
             f = self.files[fileType]
             if f and not f.closed:
-                f.close()
+                try:
+                    f.close()
+                except Exception as e:
+                    Debug('Error writing "%s": %s' % (f.name, e), msgType='ERROR')
+                    if error is None:
+                        error = e
+
+        if self.incremental:
+            # Index of the partially written files would be wrong
+            if error is None:
+                self.saveIndex()
+            else:
+                self.removeIndex()
+
+        if error is not None:
+            raise error
 
 
     def getFileByPluginType(self, pluginType):
@@ -407,6 +883,105 @@ class VRayExportFiles:
 ##        ##   ##  ##        ##     ## ##    ##     ##
 ######## ##     ## ##         #######  ##     ##    ##
 
+# Attribute name to slot mapping shared by the plugin caches.
+# Plugins of the same type usually write the same attributes
+# in the same order, so they end up with the same layout object
+# instead of a dict per plugin.
+#
+class VRayPluginCacheLayout:
+    __slots__ = ('slots', 'next')
+
+    def __init__(self, slots=None):
+        # { attrName : offset of the attribute data in VRayPluginCache.data }
+        self.slots = slots if slots is not None else {}
+        # { attrName : VRayPluginCacheLayout }
+        self.next  = {}
+
+    # Returns layout with the attribute added
+    #
+    def add(self, attrName):
+        layout = self.next.get(attrName)
+        if layout is None:
+            attrName = sys.intern(attrName)
+            slots = dict(self.slots)
+            slots[attrName] = len(slots) * 2
+            layout = VRayPluginCacheLayout(slots)
+            self.next[attrName] = layout
+        return layout
+
+
+# Large values are stored compressed together with the hash
+# of the value; compressed values are compared by hash only.
+# Other values are shared through the value table:
+#   { value : value }
+#
+def PackCacheValue(value, valueTable):
+    if len(value) >= CachePackSize:
+        return (hash(value), zlib.compress(value.encode('utf-8')))
+    return valueTable.setdefault(value, value)
+
+
+def UnpackCacheValue(value):
+    if type(value) is tuple:
+        return zlib.decompress(value[1]).decode('utf-8')
+    return value
+
+
+# Animation value cache of a single plugin.
+# Attribute data is stored at the layout offset as
+#   [frame the value was last changed on, value (see PackCacheValue), ...]
+# NOTE: Lookup is done in VRayPluginExporter.writeAttibute() directly,
+# it's called for every attribute of every frame
+#
+class VRayPluginCache:
+    __slots__ = ('layout', 'data')
+
+    def __init__(self, layout):
+        self.layout = layout
+        self.data   = []
+
+    def add(self, attrName, frame, value, valueTable):
+        self.layout = self.layout.add(attrName)
+        self.data.append(frame)
+        self.data.append(PackCacheValue(value, valueTable))
+
+    def getValues(self):
+        return self.data[1::2]
+
+
+# Returns indexes of the samples that have to be kept, so that
+# the dropped ones could be restored by linear interpolation
+# within the tolerance.
+#
+# @samples - list of (frame, (component, ...), value)
+#
+def ReduceKeyframes(samples, tolerance):
+    samplesCount = len(samples)
+    if samplesCount < 3:
+        return list(range(samplesCount))
+
+    def _canDrop(anchor, end):
+        f0, v0, s0 = samples[anchor]
+        f1, v1, s1 = samples[end]
+        for i in range(anchor + 1, end):
+            f, v, s = samples[i]
+            t = (f - f0) / (f1 - f0)
+            for c0, c1, c in zip(v0, v1, v):
+                if abs(c0 + (c1 - c0) * t - c) > tolerance:
+                    return False
+        return True
+
+    kept   = [0]
+    anchor = 0
+    for end in range(2, samplesCount):
+        if not _canDrop(anchor, end):
+            anchor = end - 1
+            kept.append(anchor)
+    kept.append(samplesCount - 1)
+
+    return kept
+
+
 class VRayPluginExporter:
     def __init__(self):
         self.fileManager = None
@@ -419,10 +994,23 @@ class VRayPluginExporter:
 
         # Param cache
         # Used to export only changed attributes
+        # { PluginName : VRayPluginCache }
         self.pluginCache = dict()
+        self.pluginCacheLayout = VRayPluginCacheLayout()
+        # Values shared between the plugin caches, see PackCacheValue()
+        self.pluginCacheValues = dict()
+        self.pluginCacheValuesLimit = CacheValuesLimit
         # Used to export data only once per frame
         self.namesCache  = set()
 
+        # Keyframe reduction
+        # Numeric attribute samples are collected for the whole animation
+        # and written reduced by writeKeyframes()
+        # { PluginName : (pluginType, pluginID, { attrName : [samples] }) }
+        self.reduceKeyframes   = False
+        self.keyframeTolerance = 1.0e-4
+        self.keyframes = dict()
+
         # Export properties for animation
         # This option could be set not for real animation, but
         # also for features like "Still Motion Blur" or "Camera Loop"
@@ -436,6 +1024,10 @@ class VRayPluginExporter:
         self.isPreview   = False
         self.imgFile     = ""
 
+        # Export transforms in plain text
+        # None means resolve on every value format
+        self.ascii = None
+
     def setAnimation(self, animation):
         self.isAnimation = animation
 
@@ -452,12 +1044,35 @@ class VRayPluginExporter:
         self.frameNumber = frame
         self.namesCache  = set()
 
+        if len(self.pluginCacheValues) > self.pluginCacheValuesLimit:
+            self._pruneCacheValues()
+
+    # Value table keeps every value ever cached; rebuild it
+    # from the values that are still in the caches
+    #
+    def _pruneCacheValues(self):
+        valueTable = {}
+        for pluginCache in self.pluginCache.values():
+            for value in pluginCache.getValues():
+                if type(value) is str:
+                    valueTable[value] = value
+
+        self.pluginCacheValues = valueTable
+        self.pluginCacheValuesLimit = max(CacheValuesLimit, len(valueTable) * 2)
+
+    def setKeyframeReduction(self, reduceKeyframes, tolerance):
+        self.reduceKeyframes   = reduceKeyframes
+        self.keyframeTolerance = tolerance
+
     def setFileManager(self, fm):
         self.fileManager = fm
 
     def setPreview(self, isPreview):
         self.isPreview = isPreview
 
+    def setAscii(self, ascii):
+        self.ascii = ascii
+
     def isPreviewRender(self):
         return self.isPreview
 
@@ -486,25 +1101,24 @@ class VRayPluginExporter:
     # This function will fill pluginAttrs dict
     # Actual write is perfomed by writeFooter
     #
-    # self.pluginCache = {
-    #   'PluginName' : {
-    #       'attrName': (frameNumber, attrValue),
-    #       ...
-    #   },
-    #   ...
-    # }
-    #
-    def _getCachedValue(self, attrName):
-        if self.pluginName not in self.pluginCache:
-            self.pluginCache[self.pluginName] = {}
-            return None,None
-        if attrName in self.pluginCache[self.pluginName]:
-            attrCache = self.pluginCache[self.pluginName][attrName]
-            return attrCache[0], attrCache[1]
-        return None,None
-
-    def _storeValueInCache(self, attrName, attrValue):
-        self.pluginCache[self.pluginName][attrName] = (self.frameNumber, attrValue)
+    def _newPluginCache(self):
+        pluginCache = VRayPluginCache(self.pluginCacheLayout)
+        self.pluginCache[sys.intern(self.pluginName)] = pluginCache
+        return pluginCache
+
+    def _storeKeyframe(self, attrName, numValue, val):
+        pluginKeyframes = self.keyframes.get(self.pluginName)
+        if pluginKeyframes is None:
+            pluginKeyframes = (self.pluginType, self.pluginID, {})
+            self.keyframes[self.pluginName] = pluginKeyframes
+
+        # Only kept keyframes are formatted, see writeKeyframes();
+        # vectors and colors could be bound to the property, make a copy
+        if hasattr(val, 'copy'):
+            val = val.copy()
+
+        attrKeyframes = pluginKeyframes[2].setdefault(attrName, [])
+        attrKeyframes.append((self.frameNumber, numValue, val))
 
     def writeAttibute(self, attrName, val):
         # Could also mean that plugin is already exported
@@ -515,46 +1129,79 @@ class VRayPluginExporter:
         # If it's not an animation export simply write attr value
         #
         if not self.isAnimation:
-            self.pluginAttrs[attrName] = LibUtils.FormatValue(val)
+            self.pluginAttrs[attrName] = LibUtils.FormatValue(val, ascii=self.ascii)
 
         # If it's an animation we should check the cache and export
         # new value or ever create a keyframe
         #
         else:
-            newValue = LibUtils.FormatValue(val)
-            cFrame, cValue = self._getCachedValue(attrName)
+            # Collect sample for the keyframe reduction;
+            # will be written by writeKeyframes()
+            if self.reduceKeyframes:
+                numValue = LibUtils.GetNumericValue(val)
+                if numValue is not None:
+                    self._storeKeyframe(attrName, numValue, val)
+                    return
+
+            newValue = LibUtils.FormatValue(val, ascii=self.ascii)
+            if type(newValue) is not str:
+                newValue = str(newValue)
+
+            pluginCache = self.pluginCache.get(self.pluginName)
+            if pluginCache is None:
+                pluginCache = self._newPluginCache()
+
+            slot = pluginCache.layout.slots.get(attrName)
 
-            attrValue = None
+            if slot is None:
+                pluginCache.add(attrName, self.frameNumber, newValue, self.pluginCacheValues)
 
-            if cValue is None:
                 attrValue  = "interpolate((%i,%s))" % (self.frameNumber, newValue)
             else:
-                if newValue == cValue:
+                data   = pluginCache.data
+                cValue = data[slot + 1]
+
+                if cValue == newValue or (type(cValue) is tuple and cValue[0] == hash(newValue)):
                     # New value is the same no need to export
                     return
-                else:
-                    prevFrame = self.frameNumber - self.frameStep
 
-                    # Cached value is more then frame step back -
-                    # need a keyframe
-                    if cFrame < prevFrame:
-                        attrValue  = "interpolate("
-                        attrValue += "(%i,%s)," % (prevFrame,        cValue)
-                        attrValue += "(%i,%s)"  % (self.frameNumber, newValue)
-                        attrValue += ")"
+                cFrame    = data[slot]
+                prevFrame = self.frameNumber - self.frameStep
 
-                    # Cached value is from previous frame -
-                    # simply new frame data
-                    else:
-                        attrValue  = "interpolate((%i,%s))" % (self.frameNumber, newValue)
+                # Store in cache
+                data[slot]     = self.frameNumber
+                data[slot + 1] = PackCacheValue(newValue, self.pluginCacheValues)
 
-            # Store in cache
-            self._storeValueInCache(attrName, newValue)
+                # Cached value is more then frame step back -
+                # need a keyframe
+                if cFrame < prevFrame:
+                    attrValue  = "interpolate("
+                    attrValue += "(%i,%s)," % (prevFrame,        UnpackCacheValue(cValue))
+                    attrValue += "(%i,%s)"  % (self.frameNumber, newValue)
+                    attrValue += ")"
+
+                # Cached value is from previous frame -
+                # simply new frame data
+                else:
+                    attrValue  = "interpolate((%i,%s))" % (self.frameNumber, newValue)
 
             # Store value for writing
             self.pluginAttrs[attrName] = attrValue
 
 
+    def _writePlugin(self, pluginType, pluginID, pluginName, pluginAttrs):
+        p = ["\n%s %s {" % (pluginID, pluginName)]
+        for attrName in sorted(pluginAttrs.keys()):
+            p.append("\n\t%s=%s;" % (attrName, pluginAttrs[attrName]))
+        p.append("\n}\n")
+
+        outputFile = self.fileManager.getOutputFile(pluginType)
+        if pluginID == 'VRayStereoscopicSettings':
+            outputFile = self.fileManager.getOutputFile('CAMERA')
+
+        outputFile.write(''.join(p))
+
+
     # This will actually write plugin data to file
     #
     def writeFooter(self):
@@ -571,16 +1218,7 @@ class VRayPluginExporter:
         if not self.pluginAttrs and self.pluginID not in NoAttrPlugins:
             return
 
-        p = "\n%s %s {" % (self.pluginID, self.pluginName)
-        for attrName in sorted(self.pluginAttrs.keys()):
-            p += "\n\t%s=%s;" % (attrName, self.pluginAttrs[attrName])
-        p += "\n}\n"
-
-        outputFile = self.fileManager.getOutputFile(self.pluginType)
-        if self.pluginID == 'VRayStereoscopicSettings':
-            outputFile = self.fileManager.getOutputFile('CAMERA')
-
-        outputFile.write(p)
+        self._writePlugin(self.pluginType, self.pluginID, self.pluginName, self.pluginAttrs)
 
         # Reset current plugin
         self.pluginType  = None
@@ -603,20 +1241,60 @@ class VRayPluginExporter:
         self.namesCache = set()
 
 
+    # Writes collected keyframes leaving only those that
+    # couldn't be restored with linear interpolation
+    #
+    def writeKeyframes(self):
+        if not self.fileManager:
+            Debug("File manager is not set!", msgType='ERROR')
+            return
+
+        for pluginName in sorted(self.keyframes.keys()):
+            pluginType, pluginID, attrKeyframes = self.keyframes[pluginName]
+
+            pluginAttrs = {}
+            for attrName in attrKeyframes:
+                samples = attrKeyframes[attrName]
+                kept    = ReduceKeyframes(samples, self.keyframeTolerance)
+                values  = LibUtils.FormatValues([samples[i][2] for i in kept], ascii=self.ascii)
+                keys = ["(%i,%s)" % (samples[i][0], value) for i, value in zip(kept, values)]
+                pluginAttrs[attrName] = "interpolate(%s)" % ",".join(keys)
+
+            self._writePlugin(pluginType, pluginID, pluginName, pluginAttrs)
+
+        self.keyframes = dict()
+
+
+    # Writes collected data to files
+    #
+    def flush(self):
+        if not self.fileManager:
+            Debug("File manager is not set!", msgType='ERROR')
+            return
+
+        self.fileManager.flush()
+
+
     def done(self):
         if not self.fileManager:
             Debug("File manager is not set!", msgType='ERROR')
         else:
+            self.fileManager.flush()
             self.fileManager.writeIncludes()
             self.fileManager.closeFiles()
 
 
+# @outputFile - opened file or any output sink (see VRayMemorySink)
+#
 class VRaySimplePluginExporter:
     def __init__(self, outputFilepath=None, outputFile=None):
         self.output = outputFile if outputFile else open(outputFilepath, 'w')
 
         self.namesCache = set()
 
+        # Export transforms in plain text
+        self.ascii = LibUtils.UseAsciiTransform()
+
         # Currently processed plugin
         self.pluginType  = None
         self.pluginID    = None
@@ -645,7 +1323,7 @@ class VRaySimplePluginExporter:
         if not self.pluginID and not self.pluginName:
             return
         # Store value for writing
-        self.pluginAttrs[attrName] = LibUtils.FormatValue(val)
+        self.pluginAttrs[attrName] = LibUtils.FormatValue(val, ascii=self.ascii)
 
     # This will actually write plugin data to file
     def writeFooter(self):
@@ -656,12 +1334,12 @@ class VRaySimplePluginExporter:
         if not self.pluginAttrs:
             return
 
-        p = "\n%s %s {" % (self.pluginID, PluginUtils.PluginName(self.pluginName))
+        p = ["\n%s %s {" % (self.pluginID, PluginUtils.PluginName(self.pluginName))]
         for attrName in sorted(self.pluginAttrs.keys()):
-            p += "\n\t%s=%s;" % (attrName, self.pluginAttrs[attrName])
-        p += "\n}\n"
+            p.append("\n\t%s=%s;" % (attrName, self.pluginAttrs[attrName]))
+        p.append("\n}\n")
 
-        self.output.write(p)
+        self.output.write(''.join(p))
 
         # Reset current plugin
         self.pluginType  = None
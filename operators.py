@@ -37,6 +37,7 @@ from bpy.props import *
 import vb30.proxy
 
 from vb30.lib     import LibUtils, BlenderUtils, PathUtils, SysUtils
+from vb30.lib     import VRayHostProbe
 from vb30.lib     import ColorUtils
 from vb30.plugins import PLUGINS, PLUGINS_ID
 from vb30         import debug
@@ -246,6 +247,37 @@ class VRAY_OT_dr_nodes_save(bpy.types.Operator):
 		return {'FINISHED'}
 
 
+class VRAY_OT_dr_nodes_probe(bpy.types.Operator):
+	bl_idname      = "vray.dr_nodes_probe"
+	bl_label       = "Check DR Nodes"
+	bl_description = "Check distributed rendering nodes availability"
+
+	def execute(self, context):
+		VRayScene = context.scene.vray
+		VRayDR = VRayScene.VRayDR
+
+		nodes = [(item.address, item.port if item.port_override else VRayDR.port) for item in VRayDR.nodes if item.address]
+		if not nodes:
+			return {'CANCELLED'}
+
+		probe = VRayHostProbe.GetHostProbe(SysUtils.GetDRNodesHistoryFilepath())
+
+		results = probe.probe(nodes, VRayDR.probeTimeout, maxAge=0.0)
+		probe.save()
+
+		for item in VRayDR.nodes:
+			if not item.address:
+				continue
+			key = VRayHostProbe.GetHostKey(item.address, item.port if item.port_override else VRayDR.port)
+			latency = results[key]
+			if latency is None:
+				self.report({'WARNING'}, "%s [%s]: not reachable" % (item.name, key))
+			else:
+				self.report({'INFO'}, "%s [%s]: %.0f ms, available %.0f%%" % (item.name, key, latency, probe.getAvailability(key) * 100.0))
+
+		return {'FINISHED'}
+
+
 ########  #######     ######## ######## ##     ## ########
    ##    ##     ##       ##    ##        ##   ##     ##
    ##    ##     ##       ##    ##         ## ##      ##
@@ -513,6 +545,7 @@ def GetRegClasses():
 		VRAY_OT_node_del,
 		VRAY_OT_dr_nodes_load,
 		VRAY_OT_dr_nodes_save,
+		VRAY_OT_dr_nodes_probe,
 		VRAY_OT_settings_to_text,
 		VRAY_OT_flip_resolution,
 		VRAY_OT_set_kelvin_color,
@@ -31,6 +31,7 @@ import bpy
 
 from vb30.debug import Debug, PrintError
 from vb30.lib   import ClassUtils
+from vb30.lib   import ExportUtils
 from vb30.lib   import SysUtils
 from vb30.lib   import PluginUtils
 
@@ -817,6 +818,51 @@ class VRayDR(bpy.types.PropertyGroup):
 		default     = 0
 	)
 
+	probeHosts = bpy.props.BoolProperty(
+		name        = "Check Nodes",
+		description = "Check render nodes before rendering; skip unreachable and slow nodes, use the faster ones first",
+		default     = True
+	)
+
+	probeTimeout = bpy.props.FloatProperty(
+		name        = "Check Timeout",
+		description = "Render node connection timeout (seconds)",
+		min         = 0.05,
+		soft_max    = 5.0,
+		precision   = 2,
+		default     = 0.5
+	)
+
+	probeMaxLatency = bpy.props.IntProperty(
+		name        = "Max Latency",
+		description = "Skip render nodes connecting longer than this (milliseconds; 0 - no limit)",
+		min         = 0,
+		soft_max    = 1000,
+		default     = 0
+	)
+
+	copyThreads = bpy.props.IntProperty(
+		name        = "Copy Threads",
+		description = "Number of threads copying assets to the shared directory while exporting (0 - copy synchronously)",
+		min         = 0,
+		soft_max    = 32,
+		default     = 4
+	)
+
+	deltaCopy = bpy.props.BoolProperty(
+		name        = "Delta Copy",
+		description = "Update proxies and light maps in the shared directory writing only the changed blocks",
+		default     = False
+	)
+
+	copyRetries = bpy.props.IntProperty(
+		name        = "Copy Retries",
+		description = "Number of retries on asset copy error",
+		min         = 0,
+		soft_max    = 10,
+		default     = 2
+	)
+
 
 ########  ########  ######   ####  ######  ######## ########     ###    ######## ####  #######  ##    ##
 ##     ## ##       ##    ##   ##  ##    ##    ##    ##     ##   ## ##      ##     ##  ##     ## ###   ##
@@ -1011,6 +1057,9 @@ def register():
 		description = "Global exporting settings"
 	)
 
+	# Build parameter export plans once
+	ExportUtils.BuildExportPlans(PLUGINS_ID)
+
 
 def unregister():
 	global PLUGINS_ID
@@ -1021,6 +1070,8 @@ def unregister():
 
 	del VRayScene.Exporter
 
+	ExportUtils.ExportPlans.clear()
+
 	for pluginName in PLUGINS_ID:
 		plugin = PLUGINS_ID[pluginName]
 		if hasattr(plugin, 'unregister'):
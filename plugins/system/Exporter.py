@@ -285,6 +285,134 @@ class VRayExporter(bpy.types.PropertyGroup):
         default     = True
     )
 
+    reduce_keyframes = bpy.props.BoolProperty(
+        name        = "Reduce Keyframes",
+        description = "Don't export animation keyframes that could be restored by linear interpolation",
+        default     = False
+    )
+
+    reduce_keyframes_tolerance = bpy.props.FloatProperty(
+        name        = "Tolerance",
+        description = "Maximum allowed difference between the dropped keyframe value and the interpolated one",
+        min         = 0.0,
+        soft_max    = 0.1,
+        precision   = 6,
+        default     = 1.0e-4
+    )
+
+    frame_pipeline = bpy.props.BoolProperty(
+        name        = "Pipeline",
+        description = "Export next frames while previous frames are rendered (every frame is exported into it's own file)",
+        default     = False
+    )
+
+    pipeline_renders = bpy.props.IntProperty(
+        name        = "Renders",
+        description = "Number of frames rendered at the same time",
+        min         = 1,
+        soft_max    = 16,
+        default     = 1
+    )
+
+    pipeline_lookahead = bpy.props.IntProperty(
+        name        = "Look Ahead",
+        description = "Maximum number of exported frames waiting for render",
+        min         = 1,
+        soft_max    = 16,
+        default     = 1
+    )
+
+    split_render = bpy.props.BoolProperty(
+        name        = "Split Render",
+        description = "Render image regions with separate V-Ray processes (requires \"Image To Blender\")",
+        default     = False
+    )
+
+    split_render_regions = bpy.props.IntProperty(
+        name        = "Regions",
+        description = "Number of image regions (and V-Ray processes)",
+        min         = 2,
+        soft_max    = 16,
+        default     = 2
+    )
+
+    render_retries = bpy.props.IntProperty(
+        name        = "Retries",
+        description = "Number of times the failed render is restarted",
+        min         = 0,
+        soft_max    = 10,
+        default     = 0
+    )
+
+    parallel_export = bpy.props.BoolProperty(
+        name        = "Parallel Export",
+        description = "Export animation frame range in chunks with background Blender processes (*.blend file must be saved)",
+        default     = False
+    )
+
+    parallel_export_workers = bpy.props.IntProperty(
+        name        = "Processes",
+        description = "Number of export processes (0 - number of CPU cores)",
+        min         = 0,
+        soft_max    = 64,
+        default     = 0
+    )
+
+    incremental_export = bpy.props.BoolProperty(
+        name        = "Incremental Export",
+        description = "Write only the data changed since the previous export (keeps unchanged files untouched)",
+        default     = False
+    )
+
+    write_threaded = bpy.props.BoolProperty(
+        name        = "Threaded Write",
+        description = "Write files from background threads (one per file)",
+        default     = False
+    )
+
+    write_buffer_size = bpy.props.IntProperty(
+        name        = "Write Buffer Size",
+        description = "Size of the data (in megabytes) collected before writing it to the file",
+        min         = 1,
+        max         = 1024,
+        default     = 8
+    )
+
+    write_binary = bpy.props.BoolProperty(
+        name        = "Binary Write",
+        description = "Open *.vrscene files in binary mode and encode data once per buffer write",
+        default     = False
+    )
+
+    compression = bpy.props.EnumProperty(
+        name = "Compression",
+        description = "Compress exported *.vrscene files",
+        items = (
+            ('NONE',  "None",  "Don't compress files"),
+            ('GZIP',  "GZip",  "Compress with gzip (*.vrscene.gz)"),
+            ('BZIP2', "BZip2", "Compress with bzip2 (*.vrscene.bz2)"),
+            ('LZMA',  "LZMA",  "Compress with lzma (*.vrscene.xz)"),
+        ),
+        default = 'NONE'
+    )
+
+    compression_types = bpy.props.EnumProperty(
+        name = "Compressed Files",
+        description = "Files to compress",
+        options = {'ENUM_FLAG'},
+        items = (
+            ('scene',       "Scene",       ""),
+            ('nodes',       "Nodes",       ""),
+            ('geometry',    "Geometry",    ""),
+            ('camera',      "Camera",      ""),
+            ('lights',      "Lights",      ""),
+            ('textures',    "Textures",    ""),
+            ('materials',   "Materials",   ""),
+            ('environment', "Environment", ""),
+        ),
+        default = {'geometry'}
+    )
+
     default_mapping = bpy.props.EnumProperty(
         name = "Default Mapping",
         description = "Defaul mapping type for procedural texture nodes without \"Mapping\" socket linked",
@@ -0,0 +1,192 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+# VRayAssetStore with 5k textures: first export copies everything,
+# hashing content only in the copy jobs; next export neither hashes
+# nor copies anything
+#
+
+import os
+import random
+import shutil
+import threading
+import time
+
+import pytest
+
+from vb30.lib import VRayAssetStore
+
+
+TexturesCount = 5000
+TextureSize   = 4 * 1024
+
+# Every n-th texture is a copy of the other one
+# under the same name in another directory
+DuplicateStep = 10
+
+
+@pytest.fixture(scope='module')
+def textures(tmp_path_factory):
+    texDirpath = tmp_path_factory.mktemp("textures")
+    rnd = random.Random(0)
+
+    filepaths = []
+    for i in range(TexturesCount):
+        if i % DuplicateStep == DuplicateStep - 1:
+            srcFilepath = filepaths[i - 1]
+            filepath = os.path.join(str(texDirpath), "dup%03i" % (i // 100), os.path.basename(srcFilepath))
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            shutil.copyfile(srcFilepath, filepath)
+        else:
+            filepath = os.path.join(str(texDirpath), "tex%03i" % (i // 100), "texture%05i.png" % i)
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            with open(filepath, 'wb') as f:
+                f.write(bytes(rnd.getrandbits(8) for j in range(TextureSize)))
+        filepaths.append(filepath)
+
+    return filepaths
+
+
+# @timings - if set, time spent in add() (export thread)
+# and in wait() is collected here
+#
+def Export(storeDirpath, filepaths, copyThreads, timings=None):
+    store = VRayAssetStore.VRayAssetStore(storeDirpath)
+    store.setCopyThreads(copyThreads)
+    store.load()
+
+    t = time.perf_counter()
+
+    assetPaths = [store.add(filepath, "textures") for filepath in filepaths]
+
+    tAdd = time.perf_counter()
+
+    errors = store.wait()
+    store.save()
+
+    if timings is not None:
+        timings.setdefault('add', []).append(tAdd - t)
+        timings.setdefault('wait', []).append(time.perf_counter() - tAdd)
+
+    assert not errors
+
+    return assetPaths
+
+
+# Returns list the calling thread and call arguments are collected to
+#
+def CountCalls(monkeypatch, obj, name):
+    calls    = []
+    function = getattr(obj, name)
+
+    def countedFunction(*args, **kwargs):
+        calls.append((threading.get_ident(),) + args)
+        return function(*args, **kwargs)
+
+    monkeypatch.setattr(obj, name, countedFunction)
+
+    return calls
+
+
+# No manifest and empty store
+#
+@pytest.mark.parametrize('copyThreads', [0, 4])
+def test_asset_store_first_export(benchmark, tmp_path, textures, copyThreads):
+    storeDirpath = str(tmp_path / "store")
+    timings = {}
+
+    def setup():
+        shutil.rmtree(storeDirpath, ignore_errors=True)
+        return (storeDirpath, textures, copyThreads, timings), {}
+
+    assetPaths = benchmark.pedantic(Export, setup=setup, rounds=3)
+
+    benchmark.extra_info['add'] = min(timings['add'])
+    benchmark.extra_info['wait'] = min(timings['wait'])
+
+    assert len(set(assetPaths)) == TexturesCount
+    for assetPath in assetPaths[:100]:
+        assert os.path.exists(os.path.join(storeDirpath, assetPath))
+
+    # Same content is stored once
+    if copyThreads == 0:
+        inodes = set(os.stat(os.path.join(storeDirpath, assetPath)).st_ino for assetPath in assetPaths)
+        assert len(inodes) == TexturesCount - TexturesCount // DuplicateStep
+
+
+# Content is never read on the export thread
+#
+def test_asset_store_hash_threads(tmp_path, textures, monkeypatch):
+    storeDirpath = str(tmp_path / "store")
+
+    hashCalls = CountCalls(monkeypatch, VRayAssetStore, 'GetFileHash')
+
+    Export(storeDirpath, textures[:500], 4)
+
+    assert len(hashCalls) == 500
+    assert threading.get_ident() not in set(call[0] for call in hashCalls)
+
+
+def test_asset_store_reexport(benchmark, tmp_path, textures, monkeypatch):
+    storeDirpath = str(tmp_path / "store")
+    firstAssetPaths = Export(storeDirpath, textures, 0)
+
+    hashCalls = CountCalls(monkeypatch, VRayAssetStore, 'GetFileHash')
+    copyCalls = CountCalls(monkeypatch, VRayAssetStore.VRayAssetStore, 'copy')
+
+    assetPaths = benchmark(Export, storeDirpath, textures, 0)
+
+    assert assetPaths == firstAssetPaths
+    assert len(hashCalls) == 0
+    assert len(copyCalls) == 0
+
+
+# Only changed textures are hashed and copied again
+#
+def test_asset_store_changed(tmp_path, textures, monkeypatch):
+    storeDirpath = str(tmp_path / "store")
+    texDirpath   = str(tmp_path / "changed")
+
+    filepaths = []
+    for i, filepath in enumerate(textures[:100]):
+        filepaths.append(os.path.join(texDirpath, "%03i" % i, os.path.basename(filepath)))
+        os.makedirs(os.path.dirname(filepaths[-1]))
+        shutil.copyfile(filepath, filepaths[-1])
+
+    firstAssetPaths = Export(storeDirpath, filepaths, 0)
+
+    changed = filepaths[::DuplicateStep]
+    for filepath in changed:
+        with open(filepath, 'ab') as f:
+            f.write(b"changed")
+
+    hashCalls = CountCalls(monkeypatch, VRayAssetStore, 'GetFileHash')
+    copyCalls = CountCalls(monkeypatch, VRayAssetStore.VRayAssetStore, 'copy')
+
+    assetPaths = Export(storeDirpath, filepaths, 0)
+
+    assert len(hashCalls) == len(changed)
+    assert len(copyCalls) == len(changed)
+    assert sum(1 for a, b in zip(assetPaths, firstAssetPaths) if a != b) == len(changed)
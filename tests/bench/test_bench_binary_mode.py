@@ -0,0 +1,86 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+# VRayExportFiles text vs binary mode (setBinaryMode) on a synthetic
+# stream of 1M attributes written to disk
+#
+
+import random
+
+import pytest
+
+import synthetic
+
+from vb30.lib import LibUtils
+
+
+AttributesCount = 1000000
+
+# Distinct value sets; plugins reuse them
+ValueSetsCount = 1000
+
+
+# Returns formatted attribute lines for every value set
+# as written by VRayPluginExporter
+#
+def GetPluginLines():
+    rnd = random.Random(0)
+    pluginLines = []
+    for i in range(ValueSetsCount):
+        attrLines = ["\n\t%s=%s;" % (attrName, LibUtils.FormatValue(value)) for attrName, value in synthetic.GetAttributeValues(rnd)]
+        pluginLines.append(attrLines)
+    return pluginLines
+
+
+def WriteStream(fm, pluginLines, pluginsCount):
+    f = fm.getOutputFile()
+    for i in range(pluginsCount):
+        f.write("\nBRDFSynthetic BRDFSynthetic%07i {" % i)
+        for attrLine in pluginLines[i % ValueSetsCount]:
+            f.write(attrLine)
+        f.write("\n}\n")
+    fm.closeFiles()
+
+
+@pytest.mark.parametrize('binaryMode', [False, True], ids=["text", "binary"])
+def test_binary_mode(benchmark, tmp_path, binaryMode):
+    pluginLines  = GetPluginLines()
+    pluginsCount = AttributesCount // len(pluginLines[0])
+
+    def setup():
+        fm = synthetic.GetExportFiles('FILE', str(tmp_path))
+        fm.setBinaryMode(binaryMode)
+        fm.init()
+        return (fm, pluginLines, pluginsCount), {}
+
+    benchmark.pedantic(WriteStream, setup=setup, rounds=3)
+
+    filepath = tmp_path / "scene.vrscene"
+    benchmark.extra_info['size'] = filepath.stat().st_size
+
+    with open(str(filepath), 'r') as f:
+        data = f.read()
+    assert data.count("\nBRDFSynthetic ") == pluginsCount
+    assert data.count(";") == pluginsCount * len(pluginLines[0])
@@ -0,0 +1,87 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+# ExportUtils.WritePlugin for the plugins exported from the
+# property groups (settings, materials, textures)
+#
+
+import bpy
+
+import synthetic
+
+from vb30.lib import ExportUtils
+
+
+# Distinct property groups; plugins reuse them
+PropGroupsCount = 1000
+
+
+def GetBus():
+    return {
+        'output' : synthetic.GetPluginExporter(),
+        'scene'  : bpy.context.scene,
+        'cache'  : {},
+    }
+
+
+def WritePlugins(pluginModule, plugins, count, useSnapshots=False):
+    bus = GetBus()
+
+    ExportUtils.SetKeepSnapshots(useSnapshots)
+    try:
+        for i in range(count):
+            pluginName, propGroup, mappedParams = plugins[i % len(plugins)]
+            if useSnapshots:
+                propGroup = ExportUtils.GetSnapshot(bus, pluginModule, propGroup)
+            ExportUtils.WritePlugin(bus, pluginModule, "%s_%i" % (pluginName, i), propGroup, mappedParams)
+    finally:
+        ExportUtils.SetKeepSnapshots(False)
+
+    return bus['output']
+
+
+def test_write_plugin_params(benchmark, sceneSize):
+    pluginModule = synthetic.GetPluginModule()
+    plugins = synthetic.GetPlugins(pluginModule, PropGroupsCount)
+
+    o = benchmark(WritePlugins, pluginModule, plugins, sceneSize)
+
+    output = synthetic.GetOutput(o)
+    assert output.count("\nBRDFSynthetic ") == sceneSize
+    assert "weights=ListFloat" in output
+    # Output types are not exported
+    assert "out_color=" not in output
+
+
+# Same, but property values are read through the snapshots
+# (property groups are not animated, so snapshots are reused)
+#
+def test_write_plugin_params_snapshot(benchmark, sceneSize):
+    pluginModule = synthetic.GetPluginModule()
+    plugins = synthetic.GetPlugins(pluginModule, PropGroupsCount)
+
+    o = benchmark(WritePlugins, pluginModule, plugins, sceneSize, True)
+
+    assert synthetic.GetOutput(o) == synthetic.GetOutput(WritePlugins(pluginModule, plugins, sceneSize))
@@ -0,0 +1,182 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+# LibUtils.FormatValue on the mixed attribute values
+#
+
+import random
+
+import bpy
+import mathutils
+import _vray_for_blender
+
+import synthetic
+
+from vb30.lib import LibUtils
+
+
+ValueSetsCount = 1000
+
+
+def GetValues(count):
+    rnd = random.Random(0)
+    valueSets = [[value for attrName, value in synthetic.GetAttributeValues(rnd)] for i in range(ValueSetsCount)]
+    return [value for i in range(count) for value in valueSets[i % ValueSetsCount]]
+
+
+# FormatValue before the type dispatch table, kept as the baseline
+#
+def LegacyFormatValue(t, subtype=None, quotes=False, ascii=False):
+    if type(t) is bool: return "%i"%(t)
+    elif type(t) is int: return "%i"%(t)
+    elif type(t) is float: return "%.6g"%(t)
+    elif type(t) is mathutils.Matrix:
+        if len(t.col) == 4:
+            if ascii or bpy.context.scene.render.engine == 'VRAY_RENDER_RT':
+                return "Transform(Matrix(Vector(%.6g,%f,%f),Vector(%.6g,%.6g,%.6g),Vector(%.6g,%.6g,%.6g)),Vector(%.12f,%.12f,%.12f))" % (t[0][0], t[1][0], t[2][0], t[0][1], t[1][1], t[2][1], t[0][2], t[1][2], t[2][2], t[0][3], t[1][3], t[2][3])
+            return _vray_for_blender.getTransformHex(t.copy())
+        else:
+            return "Matrix(Vector(%.6g,%f,%f),Vector(%.6g,%.6g,%.6g),Vector(%.6g,%.6g,%.6g))" % (t[0][0], t[1][0], t[2][0], t[0][1], t[1][1], t[2][1], t[0][2], t[1][2], t[2][2])
+    elif type(t) is mathutils.Vector: return "Vector(%.3g,%.3g,%.3g)" % (t.x,t.y,t.z)
+    elif type(t) is mathutils.Color:
+        if subtype: return "AColor(%.3g,%.3g,%.3g,1.0)" % (t.r,t.g,t.b)
+        return "Color(%.3g,%.3g,%.3g)" % (t.r,t.g,t.b)
+    elif type(t) is str:
+        if t == "True": return "1"
+        if t == "False": return "0"
+    if quotes: return '"%s"' % t
+    return t
+
+
+def FormatAll(values, ascii):
+    FormatValue = LibUtils.FormatValue
+    return [FormatValue(value, ascii=ascii) for value in values]
+
+
+def FormatAllLegacy(values, ascii):
+    return [LegacyFormatValue(value, ascii=ascii) for value in values]
+
+
+def test_format_value(benchmark, sceneSize):
+    values = GetValues(sceneSize)
+
+    result = benchmark(FormatAll, values, False)
+
+    assert len(result) == len(values)
+
+
+def test_format_value_ascii(benchmark, sceneSize):
+    values = GetValues(sceneSize)
+
+    result = benchmark(FormatAll, values, True)
+
+    assert result[8].startswith("Transform(Matrix(")
+
+
+# Pure Python hex encoders, without the native module
+#
+def test_format_value_python_hex(benchmark, sceneSize, monkeypatch):
+    monkeypatch.setattr(LibUtils, '_vray_for_blender', None)
+
+    values = GetValues(sceneSize)
+
+    result = benchmark(FormatAll, values, False)
+
+    assert result[8].startswith("TransformHex(")
+
+
+def test_format_value_legacy(benchmark, sceneSize):
+    values = GetValues(sceneSize)
+
+    result = benchmark(FormatAllLegacy, values, True)
+
+    assert result == FormatAll(values, True)
+
+
+def test_format_values(benchmark, sceneSize):
+    values = GetValues(sceneSize)
+
+    result = benchmark(LibUtils.FormatValues, values, ascii=True)
+
+    assert result == FormatAll(values, True)
+
+
+def test_format_list(benchmark, sceneSize):
+    rnd = random.Random(0)
+    values = [rnd.random() for i in range(sceneSize * 10)]
+
+    result = benchmark(LibUtils.FormatList, values, 'Float', True)
+
+    assert result.startswith("ListFloatHex(")
+
+
+# Known native output: identity transform from templates/defaults.vrscene
+# and hand encoded IEEE 754 little endian values:
+#   1.0f = 0000803F, 2.0f = 00000040, -1.0f = 000080BF,
+#   4.0 = 0000000000001040, 5.0 = 0000000000001440, 0.5 = 000000000000E03F
+# Transform is 9 floats by columns, 4 bytes of padding, 3 doubles
+#
+IdentityTransformHex = 'TransformHex("0000803F0000000000000000000000000000803F0000000000000000000000000000803F00000000000000000000000000000000000000000000000000000000")'
+
+Transform = [
+    [1.0, 0.0,  0.0, 4.0],
+    [0.0, 2.0,  0.0, 5.0],
+    [0.0, 0.0, -1.0, 0.5],
+    [0.0, 0.0,  0.0, 1.0],
+]
+
+TransformHex = 'TransformHex("' \
+    '0000803F' '00000000' '00000000' \
+    '00000000' '00000040' '00000000' \
+    '00000000' '00000000' '000080BF' \
+    '00000000' \
+    '0000000000001040' '0000000000001440' '000000000000E03F' \
+    '")'
+
+MatrixHex = 'MatrixHex("' \
+    '0000803F' '00000000' '00000000' \
+    '00000000' '00000040' '00000000' \
+    '00000000' '00000000' '000080BF' \
+    '")'
+
+
+def test_transform_hex_native(nativeCalls):
+    assert LibUtils.FormatValue(mathutils.Matrix(), ascii=False) == IdentityTransformHex
+    assert LibUtils.FormatValue(mathutils.Matrix(Transform), ascii=False) == TransformHex
+    assert len(nativeCalls.GetCalls('getTransformHex')) == 2
+
+
+def test_transform_hex_python(monkeypatch):
+    monkeypatch.setattr(LibUtils, '_vray_for_blender', None)
+
+    assert LibUtils.FormatValue(mathutils.Matrix(), ascii=False) == IdentityTransformHex
+    assert LibUtils.FormatValue(mathutils.Matrix(Transform), ascii=False) == TransformHex
+
+
+def test_matrix_hex():
+    tm = mathutils.Matrix([row[:3] for row in Transform[:3]])
+
+    assert LibUtils.FormatValue(tm, ascii=False) == MatrixHex
+    assert LibUtils.FormatValue(tm, ascii=True) == "Matrix(Vector(1,0.000000,0.000000),Vector(0,2,0),Vector(0,0,-1))"
@@ -0,0 +1,61 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+# nodes.importing.createNode: imports a fixed number of materials
+# (each with the linked texture) from the scene of the given size;
+# shows how the plugin lookup scales with the scene size
+#
+
+import synthetic
+
+from vb30.nodes import importing
+
+
+ImportedMaterials = 100
+
+
+def ImportMaterials(vrsceneDict):
+    ntrees = []
+    for i in range(ImportedMaterials):
+        pluginDesc = importing.getPluginByName(vrsceneDict, "Mtl%06i" % i)
+        ntree = synthetic.NodeTree()
+        importing.createNode(ntree, None, vrsceneDict, pluginDesc)
+        ntrees.append(ntree)
+    return ntrees
+
+
+def test_importer(benchmark, sceneSize):
+    synthetic.RegisterImporterPlugins()
+
+    # Materials are at the end of the scene like in the
+    # exported files where materials go after textures
+    vrsceneDict = list(reversed(synthetic.GetVrsceneDict(max(sceneSize, ImportedMaterials * 2))))
+
+    ntrees = benchmark(ImportMaterials, vrsceneDict)
+
+    assert len(ntrees) == ImportedMaterials
+    for ntree in ntrees:
+        assert len(ntree.nodes.nodes) == 2
+        assert len(ntree.links.links) == 1
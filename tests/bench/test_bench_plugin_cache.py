@@ -0,0 +1,212 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+# VRayPluginExporter animation cache: replays a recorded writeAttibute
+# trace and reports time and memory of the VRayPluginCache against
+# the dict of (frame, value) tuples it replaced
+#
+
+import random
+import sys
+
+import synthetic
+
+from vb30.lib import LibUtils
+from vb30.lib import VRayStream
+
+
+FramesCount = 4
+
+# Distinct value sets; plugins reuse them
+ValueSetsCount = 1000
+
+
+# Exporter with the plugin cache used before VRayPluginCache;
+# everything else is the same as in VRayPluginExporter.writeAttibute()
+#
+class LegacyPluginExporter(VRayStream.VRayPluginExporter):
+    def writeAttibute(self, attrName, val):
+        if not self.pluginID and not self.pluginName:
+            return
+
+        if not self.isAnimation:
+            self.pluginAttrs[attrName] = LibUtils.FormatValue(val, ascii=self.ascii)
+            return
+
+        if self.reduceKeyframes:
+            numValue = LibUtils.GetNumericValue(val)
+            if numValue is not None:
+                self._storeKeyframe(attrName, numValue, val)
+                return
+
+        newValue = LibUtils.FormatValue(val, ascii=self.ascii)
+        if type(newValue) is not str:
+            newValue = str(newValue)
+
+        pluginCache = self.pluginCache.setdefault(self.pluginName, {})
+        cFrame, cValue = pluginCache.get(attrName, (None, None))
+
+        if cValue is None:
+            attrValue = "interpolate((%i,%s))" % (self.frameNumber, newValue)
+        else:
+            if newValue == cValue:
+                return
+            prevFrame = self.frameNumber - self.frameStep
+            if cFrame < prevFrame:
+                attrValue  = "interpolate("
+                attrValue += "(%i,%s)," % (prevFrame,        cValue)
+                attrValue += "(%i,%s)"  % (self.frameNumber, newValue)
+                attrValue += ")"
+            else:
+                attrValue = "interpolate((%i,%s))" % (self.frameNumber, newValue)
+
+        pluginCache[attrName] = (self.frameNumber, newValue)
+
+        self.pluginAttrs[attrName] = attrValue
+
+
+# Records plugin calls as
+#   [(frame, pluginType, pluginID, pluginName, [(attrName, value), ...]), ...]
+#
+class TraceRecorder(VRayStream.VRayPluginExporter):
+    def __init__(self):
+        VRayStream.VRayPluginExporter.__init__(self)
+        self.trace = []
+
+    def writeHeader(self):
+        self.trace.append((self.frameNumber, self.pluginType, self.pluginID, self.pluginName, []))
+
+    def writeAttibute(self, attrName, val):
+        self.trace[-1][4].append((attrName, val))
+
+    def writeFooter(self):
+        pass
+
+
+# Synthetic animation: every frame a part of the plugins
+# switches to the other value set
+#
+def RecordTrace(count):
+    rnd = random.Random(0)
+    pluginValues = [synthetic.GetAttributeValues(rnd) for i in range(ValueSetsCount)]
+
+    o = TraceRecorder()
+    for frame in range(1, FramesCount + 1):
+        o.setFrame(frame)
+        for i in range(count):
+            o.set('BRDF', 'BRDFSynthetic', "BRDFSynthetic%06i" % i)
+            o.writeHeader()
+            for attrName, value in pluginValues[(i + frame // (1 + i % 3)) % ValueSetsCount]:
+                o.writeAttibute(attrName, value)
+            o.writeFooter()
+
+    return o.trace
+
+
+def ReplayTrace(exporterClass, trace):
+    o = exporterClass()
+    o.setFileManager(synthetic.GetExportFiles('MEMORY'))
+    o.getFileManager().init()
+    o.setAnimation(True)
+
+    frame = None
+    for traceFrame, pluginType, pluginID, pluginName, attrs in trace:
+        if traceFrame != frame:
+            frame = traceFrame
+            o.setFrame(frame)
+        o.set(pluginType, pluginID, pluginName)
+        o.writeHeader()
+        for attrName, value in attrs:
+            o.writeAttibute(attrName, value)
+        o.writeFooter()
+
+    o.flush()
+
+    return o
+
+
+# Size of the object with everything it references;
+# shared objects are counted once
+#
+def GetObjectSize(obj, seen=None):
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += GetObjectSize(key, seen) + GetObjectSize(value, seen)
+    elif isinstance(obj, (list, tuple)):
+        for item in obj:
+            size += GetObjectSize(item, seen)
+    elif isinstance(obj, (VRayStream.VRayPluginCache, VRayStream.VRayPluginCacheLayout)):
+        for slot in obj.__slots__:
+            size += GetObjectSize(getattr(obj, slot), seen)
+
+    return size
+
+
+# Legacy exporter has no value table
+#
+def GetCacheSize(o):
+    return GetObjectSize((o.pluginCache, getattr(o, 'pluginCacheValues', None)))
+
+
+def BenchmarkCache(benchmark, exporterClass, sceneSize):
+    trace = RecordTrace(sceneSize)
+
+    o = benchmark.pedantic(ReplayTrace, args=(exporterClass, trace), rounds=3)
+
+    benchmark.extra_info['cache_bytes'] = GetCacheSize(o)
+
+    return o
+
+
+def test_plugin_cache(benchmark, sceneSize):
+    o = BenchmarkCache(benchmark, VRayStream.VRayPluginExporter, sceneSize)
+
+    assert len(o.pluginCache) == sceneSize
+
+
+def test_plugin_cache_legacy(benchmark, sceneSize):
+    o = BenchmarkCache(benchmark, LegacyPluginExporter, sceneSize)
+
+    assert len(o.pluginCache) == sceneSize
+
+
+# Both caches produce the same output and the new one is smaller
+#
+def test_plugin_cache_compare():
+    trace = RecordTrace(1000)
+
+    o       = ReplayTrace(VRayStream.VRayPluginExporter, trace)
+    oLegacy = ReplayTrace(LegacyPluginExporter, trace)
+
+    assert synthetic.GetOutput(o) == synthetic.GetOutput(oLegacy)
+    assert "interpolate((%i," % FramesCount in synthetic.GetOutput(o)
+    assert GetCacheSize(o) < GetCacheSize(oLegacy)
@@ -0,0 +1,85 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+# VRayPluginExporter: set / writeAttibute / writeFooter
+# for every plugin of the scene written into memory
+#
+
+import random
+
+import synthetic
+
+
+# Distinct value sets; plugins reuse them
+ValueSetsCount = 1000
+
+
+def ExportPlugins(pluginValues, count):
+    o = synthetic.GetPluginExporter()
+
+    for i in range(count):
+        o.set('BRDF', 'BRDFSynthetic', "BRDFSynthetic%06i" % i)
+        o.writeHeader()
+        for attrName, value in pluginValues[i % len(pluginValues)]:
+            o.writeAttibute(attrName, value)
+        o.writeFooter()
+
+    o.flush()
+
+    return o
+
+
+def test_writer(benchmark, sceneSize):
+    rnd = random.Random(0)
+    pluginValues = [synthetic.GetAttributeValues(rnd) for i in range(ValueSetsCount)]
+
+    o = benchmark(ExportPlugins, pluginValues, sceneSize)
+
+    output = synthetic.GetOutput(o)
+    assert output.count("\nBRDFSynthetic ") == sceneSize
+    assert "TransformHex(" in output
+
+
+def test_writer_animation(benchmark, sceneSize):
+    rnd = random.Random(0)
+    pluginValues = [synthetic.GetAttributeValues(rnd) for i in range(ValueSetsCount)]
+
+    def exportFrames():
+        o = synthetic.GetPluginExporter()
+        o.setAnimation(True)
+        # Second frame writes only the changed values
+        for frame in (1, 2):
+            o.setFrame(frame)
+            for i in range(sceneSize):
+                o.set('BRDF', 'BRDFSynthetic', "BRDFSynthetic%06i" % i)
+                o.writeHeader()
+                for attrName, value in pluginValues[(i + frame - 1) % len(pluginValues)]:
+                    o.writeAttibute(attrName, value)
+                o.writeFooter()
+        return o
+
+    o = benchmark(exportFrames)
+
+    assert "interpolate((2," in synthetic.GetOutput(o)
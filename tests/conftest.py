@@ -0,0 +1,144 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+# Loads the exporter core under plain CPython:
+#   - "stubs" directory replaces bpy, mathutils and the native modules
+#   - add-on directory is imported as "vb30" package without running
+#     the add-on registration
+#
+# Benchmarks use pytest-benchmark if it's installed, otherwise
+# a simple "benchmark" fixture with the same call interface.
+#
+
+import os
+import sys
+import time
+import types
+
+import pytest
+
+
+TestsDir = os.path.dirname(os.path.abspath(__file__))
+RootDir  = os.path.dirname(TestsDir)
+
+sys.path.insert(0, os.path.join(TestsDir, "stubs"))
+
+if 'vb30' not in sys.modules:
+    vb30 = types.ModuleType('vb30')
+    vb30.__path__ = [RootDir]
+    sys.modules['vb30'] = vb30
+
+
+try:
+    import pytest_benchmark
+except ImportError:
+    pytest_benchmark = None
+
+
+DefaultSceneSizes = "1000,10000,100000"
+
+
+def pytest_addoption(parser):
+    parser.addoption("--scene-sizes", default=DefaultSceneSizes,
+        help="Comma separated number of plugins in synthetic benchmark scenes (default: %s)" % DefaultSceneSizes)
+
+
+def pytest_generate_tests(metafunc):
+    if 'sceneSize' in metafunc.fixturenames:
+        sizes = [int(size) for size in metafunc.config.getoption('scene_sizes').split(",")]
+        metafunc.parametrize('sceneSize', sizes, ids=["%i" % size for size in sizes])
+
+
+@pytest.fixture
+def nativeCalls():
+    import _vray_for_blender
+    _vray_for_blender.Clear()
+    yield _vray_for_blender
+    _vray_for_blender.Clear()
+
+
+if pytest_benchmark is None:
+    BenchmarkResults = []
+
+    # Subset of the pytest-benchmark fixture interface
+    #
+    class SimpleBenchmark:
+        # Rounds are repeated until one of the limits is reached
+        MaxRounds = 5
+        MaxTime   = 1.0
+
+        def __init__(self, name):
+            self.name       = name
+            self.extra_info = {}
+            self.times      = []
+
+        def __call__(self, function, *args, **kwargs):
+            return self._run(function, args, kwargs, None, None, 1)
+
+        def pedantic(self, target, args=(), kwargs=None, setup=None, rounds=1, iterations=1, warmup_rounds=0):
+            for i in range(warmup_rounds):
+                self._runRound(target, args, kwargs or {}, setup, iterations)
+            return self._run(target, args, kwargs or {}, setup, rounds, iterations)
+
+        def _runRound(self, function, args, kwargs, setup, iterations):
+            if setup is not None:
+                setupResult = setup()
+                if setupResult is not None:
+                    args, kwargs = setupResult
+            t = time.perf_counter()
+            for i in range(iterations):
+                result = function(*args, **kwargs)
+            self.times.append((time.perf_counter() - t) / iterations)
+            return result
+
+        def _run(self, function, args, kwargs, setup, rounds, iterations):
+            self.times = []
+            started = time.perf_counter()
+            while True:
+                result = self._runRound(function, args, kwargs, setup, iterations)
+                if rounds is not None:
+                    if len(self.times) >= rounds:
+                        break
+                elif len(self.times) >= self.MaxRounds or time.perf_counter() - started >= self.MaxTime:
+                    break
+            BenchmarkResults.append(self)
+            return result
+
+    @pytest.fixture
+    def benchmark(request):
+        return SimpleBenchmark(request.node.nodeid.split("::", 1)[-1])
+
+    def pytest_terminal_summary(terminalreporter):
+        if not BenchmarkResults:
+            return
+
+        terminalreporter.section("benchmark")
+
+        nameWidth = max(len(bench.name) for bench in BenchmarkResults)
+        terminalreporter.write_line("%-*s %10s %10s %7s  %s" % (nameWidth, "Name", "Min (ms)", "Mean (ms)", "Rounds", "Info"))
+
+        for bench in BenchmarkResults:
+            info = ", ".join("%s=%s" % item for item in sorted(bench.extra_info.items()))
+            terminalreporter.write_line("%-*s %10.3f %10.3f %7i  %s" % (nameWidth, bench.name,
+                min(bench.times) * 1000.0, sum(bench.times) / len(bench.times) * 1000.0, len(bench.times), info))
@@ -0,0 +1,80 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+# Recording replacement of the native exporter module:
+# every call is stored in Calls and returns the value from Results
+# (None by default)
+#
+
+import binascii
+import struct
+
+
+# Same output as the native function: memory of the C++ transform,
+# float 3x3 matrix and double offset aligned to 8 bytes
+#
+def _getTransformHex(t):
+    data  = struct.pack('=9f',
+        t[0][0], t[1][0], t[2][0],
+        t[0][1], t[1][1], t[2][1],
+        t[0][2], t[1][2], t[2][2])
+    data += b'\0' * (-len(data) % 8)
+    data += struct.pack('=3d', t[0][3], t[1][3], t[2][3])
+    return 'TransformHex("%s")' % binascii.hexlify(data).upper().decode('ascii')
+
+
+DefaultResults = {
+    'getTransformHex' : _getTransformHex,
+}
+
+Calls   = []
+Results = dict(DefaultResults)
+
+
+def Clear():
+    Calls.clear()
+    Results.clear()
+    Results.update(DefaultResults)
+
+
+def GetCalls(name):
+    return [(args, kwargs) for callName, args, kwargs in Calls if callName == name]
+
+
+def _recorder(name):
+    def record(*args, **kwargs):
+        Calls.append((name, args, kwargs))
+        result = Results.get(name)
+        if callable(result):
+            return result(*args, **kwargs)
+        return result
+    record.__name__ = name
+    return record
+
+
+def __getattr__(name):
+    if name.startswith('__'):
+        raise AttributeError(name)
+    return _recorder(name)
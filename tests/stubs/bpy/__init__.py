@@ -0,0 +1,78 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+# Minimal "bpy" replacement to load the exporter core under plain CPython.
+# Only what is touched at module level and by the exporter core is
+# implemented; anything else is a no-op.
+#
+
+from . import app
+from . import path
+from . import props
+from . import types
+from . import utils
+
+
+class Namespace:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def NewScene():
+    return Namespace(
+        name = "Scene",
+        frame_current = 1,
+        frame_start   = 1,
+        frame_end     = 250,
+        frame_step    = 1,
+        animation_data = None,
+        camera = None,
+        render = Namespace(
+            engine = 'VRAY_RENDER',
+            resolution_x = 1920,
+            resolution_y = 1080,
+            resolution_percentage = 100,
+            threads_mode = 'AUTO',
+            threads = 1,
+            use_border = False,
+        ),
+        vray = Namespace(
+            Exporter = Namespace(
+                debug = False,
+                data_format = 'ASCII',
+            ),
+            VRayDR = Namespace(
+                on = False,
+                assetSharing = 'TRANSFER',
+            ),
+        ),
+    )
+
+
+context = Namespace(scene=NewScene())
+
+data = Namespace(
+    filepath = "",
+    is_dirty = False,
+)
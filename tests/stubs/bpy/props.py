@@ -0,0 +1,90 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+# Property definitions only keep their arguments;
+# types.PropertyGroup instances are filled with the defaults
+#
+
+DefaultValues = {
+    'BOOL'       : False,
+    'INT'        : 0,
+    'FLOAT'      : 0.0,
+    'STRING'     : "",
+    'ENUM'       : "",
+    'POINTER'    : None,
+    'COLLECTION' : None,
+}
+
+
+class Property:
+    def __init__(self, propType, **kwargs):
+        self.propType = propType
+        self.kwargs   = kwargs
+
+    def getDefault(self):
+        if 'default' in self.kwargs:
+            default = self.kwargs['default']
+        elif self.propType.endswith('VECTOR'):
+            default = (0.0,) * self.kwargs.get('size', 3)
+        else:
+            default = DefaultValues[self.propType]
+        if type(default) is tuple:
+            default = list(default)
+        return default
+
+
+def BoolProperty(**kwargs):
+    return Property('BOOL', **kwargs)
+
+def BoolVectorProperty(**kwargs):
+    return Property('BOOL_VECTOR', **kwargs)
+
+def IntProperty(**kwargs):
+    return Property('INT', **kwargs)
+
+def IntVectorProperty(**kwargs):
+    return Property('INT_VECTOR', **kwargs)
+
+def FloatProperty(**kwargs):
+    return Property('FLOAT', **kwargs)
+
+def FloatVectorProperty(**kwargs):
+    return Property('FLOAT_VECTOR', **kwargs)
+
+def StringProperty(**kwargs):
+    return Property('STRING', **kwargs)
+
+def EnumProperty(**kwargs):
+    return Property('ENUM', **kwargs)
+
+def PointerProperty(**kwargs):
+    return Property('POINTER', **kwargs)
+
+def CollectionProperty(**kwargs):
+    return Property('COLLECTION', **kwargs)
+
+def RemoveProperty(cls, attr):
+    if attr in cls.__dict__:
+        delattr(cls, attr)
@@ -0,0 +1,74 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+from . import props
+
+
+class RNAStruct:
+    def __init__(self, properties):
+        self.properties = properties
+
+
+# Property group instance has the class property definitions
+# as plain attributes set to the default values
+#
+class PropertyGroup:
+    def __init__(self):
+        for attrName, prop in self.getProperties().items():
+            setattr(self, attrName, prop.getDefault())
+
+    @classmethod
+    def getProperties(cls):
+        properties = {}
+        for klass in reversed(cls.__mro__):
+            for attrName, value in vars(klass).items():
+                if isinstance(value, props.Property):
+                    properties[attrName] = value
+        return properties
+
+    @property
+    def bl_rna(self):
+        return RNAStruct(self.getProperties())
+
+    def as_pointer(self):
+        return id(self)
+
+    def __contains__(self, key):
+        return False
+
+
+class Base:
+    pass
+
+
+# Any other type (Operator, Panel, Node, NodeSocket, ...) is
+# just a base class
+#
+def __getattr__(name):
+    if name.startswith('__'):
+        raise AttributeError(name)
+    cls = type(name, (Base,), {})
+    globals()[name] = cls
+    return cls
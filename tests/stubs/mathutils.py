@@ -0,0 +1,129 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+# Pure Python replacement of the mathutils types used by the exporter
+#
+
+
+class Vector:
+    def __init__(self, seq=(0.0, 0.0, 0.0)):
+        self._data = [float(v) for v in seq]
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __getitem__(self, i):
+        return self._data[i]
+
+    def __setitem__(self, i, value):
+        self._data[i] = float(value)
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return "Vector(%s)" % tuple(self._data)
+
+    def copy(self):
+        return Vector(self._data)
+
+    @property
+    def x(self):
+        return self._data[0]
+
+    @property
+    def y(self):
+        return self._data[1]
+
+    @property
+    def z(self):
+        return self._data[2]
+
+
+class Color:
+    def __init__(self, rgb=(0.0, 0.0, 0.0)):
+        self.r, self.g, self.b = (float(v) for v in rgb)
+
+    def __len__(self):
+        return 3
+
+    def __iter__(self):
+        return iter((self.r, self.g, self.b))
+
+    def __getitem__(self, i):
+        return (self.r, self.g, self.b)[i]
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return "Color(%s)" % ((self.r, self.g, self.b),)
+
+    def copy(self):
+        return Color(self)
+
+
+# Row major matrix; 4x4 identity by default like in Blender
+#
+class Matrix:
+    def __init__(self, rows=None):
+        if rows is None:
+            rows = [[1.0 if r == c else 0.0 for c in range(4)] for r in range(4)]
+        self._rows = [Vector(row) for row in rows]
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __getitem__(self, i):
+        return self._rows[i]
+
+    def __eq__(self, other):
+        return [list(row) for row in self] == [list(row) for row in other]
+
+    def __repr__(self):
+        return "Matrix(%s)" % [list(row) for row in self._rows]
+
+    @property
+    def row(self):
+        return self._rows
+
+    @property
+    def col(self):
+        return [Vector(col) for col in zip(*self._rows)]
+
+    def copy(self):
+        return Matrix(self._rows)
+
+    def identity(self):
+        size = len(self._rows)
+        for r in range(size):
+            for c in range(size):
+                self._rows[r][c] = 1.0 if r == c else 0.0
@@ -0,0 +1,280 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+# Synthetic scenes for the benchmarks
+#
+
+import random
+import tempfile
+import types
+
+import bpy
+import mathutils
+
+
+# Parameters of the synthetic plugin: every export
+# handling of ExportUtils.WritePluginParams is present
+#
+PluginParams = (
+    {'attr' : 'diffuse',        'type' : 'COLOR',          'default' : (0.8, 0.8, 0.8)},
+    {'attr' : 'diffuse_tex',    'type' : 'TEXTURE',        'default' : (0.0, 0.0, 0.0, 1.0)},
+    {'attr' : 'roughness',      'type' : 'FLOAT',          'default' : 0.0},
+    {'attr' : 'roughness_tex',  'type' : 'FLOAT_TEXTURE',  'default' : 0.0},
+    {'attr' : 'reflect',        'type' : 'COLOR',          'default' : (0.0, 0.0, 0.0)},
+    {'attr' : 'reflect_glossiness', 'type' : 'FLOAT',      'default' : 1.0},
+    {'attr' : 'subdivs',        'type' : 'INT',            'default' : 8},
+    {'attr' : 'trace_depth',    'type' : 'INT',            'default' : 5},
+    {'attr' : 'use_fresnel',    'type' : 'BOOL',           'default' : True},
+    {'attr' : 'brdf_type',      'type' : 'ENUM',           'default' : '1',
+        'items' : (('0', "Phong", ""), ('1', "Blinn", ""), ('2', "Ward", ""))},
+    {'attr' : 'channels',       'type' : 'STRING',         'default' : ""},
+    {'attr' : 'uvwgen',         'type' : 'UVWGEN',         'default' : ""},
+    {'attr' : 'transform',      'type' : 'TRANSFORM',      'default' : None},
+    {'attr' : 'weights',        'type' : 'FLOAT_LIST',     'default' : ""},
+    {'attr' : 'out_color',      'type' : 'OUTPUT_COLOR',   'default' : (0.0, 0.0, 0.0)},
+)
+
+TypeToProperty = {
+    'COLOR'  : bpy.props.FloatVectorProperty,
+    'FLOAT'  : bpy.props.FloatProperty,
+    'INT'    : bpy.props.IntProperty,
+    'BOOL'   : bpy.props.BoolProperty,
+    'ENUM'   : bpy.props.EnumProperty,
+    'STRING' : bpy.props.StringProperty,
+}
+
+
+def GetPluginModule(pluginID='BRDFSynthetic', pluginType='BRDF'):
+    pluginModule = types.ModuleType(pluginID)
+    pluginModule.ID   = pluginID
+    pluginModule.TYPE = pluginType
+    pluginModule.NAME = pluginID
+    pluginModule.PluginParams = PluginParams
+    return pluginModule
+
+
+def GetPropGroupClass(pluginModule):
+    classMembers = {}
+    for attrDesc in pluginModule.PluginParams:
+        propFunc = TypeToProperty.get(attrDesc['type'])
+        if propFunc is not None:
+            classMembers[attrDesc['attr']] = propFunc(default=attrDesc['default'])
+    return type(pluginModule.ID, (bpy.types.PropertyGroup,), classMembers)
+
+
+def GetTransform(rnd):
+    tm = mathutils.Matrix()
+    for r in range(3):
+        for c in range(4):
+            tm[r][c] = rnd.uniform(-10.0, 10.0)
+    return tm
+
+
+# Returns list of (pluginName, propGroup, mappedParams)
+#
+def GetPlugins(pluginModule, count, seed=0):
+    rnd = random.Random(seed)
+
+    propGroupClass = GetPropGroupClass(pluginModule)
+
+    plugins = []
+    for i in range(count):
+        propGroup = propGroupClass()
+        propGroup.diffuse   = mathutils.Color((rnd.random(), rnd.random(), rnd.random()))
+        propGroup.reflect   = mathutils.Color((rnd.random(), rnd.random(), rnd.random()))
+        propGroup.roughness = rnd.random()
+        propGroup.subdivs   = rnd.randint(1, 32)
+        propGroup.brdf_type = rnd.choice(('0', '1', '2'))
+
+        mappedParams = {
+            'diffuse_tex' : "Tex%06i" % i,
+            'uvwgen'      : "UVW%06i" % (i % 16),
+            'transform'   : GetTransform(rnd),
+            'weights'     : [rnd.random() for w in range(4)],
+        }
+
+        plugins.append(("%s%06i" % (pluginModule.ID, i), propGroup, mappedParams))
+
+    return plugins
+
+
+# Returns list of (attrName, value) as passed to writeAttibute()
+# for a single plugin
+#
+def GetAttributeValues(rnd):
+    return [
+        ('diffuse',            mathutils.Color((rnd.random(), rnd.random(), rnd.random()))),
+        ('diffuse_tex',        "TexBitmap%06i" % rnd.randint(0, 999999)),
+        ('roughness',          rnd.random()),
+        ('reflect',            mathutils.Color((rnd.random(), rnd.random(), rnd.random()))),
+        ('reflect_glossiness', rnd.random()),
+        ('subdivs',            rnd.randint(1, 32)),
+        ('use_fresnel',        rnd.random() > 0.5),
+        ('normal',             mathutils.Vector((rnd.random(), rnd.random(), rnd.random()))),
+        ('transform',          GetTransform(rnd)),
+        ('channels',           "List()"),
+    ]
+
+
+def GetExportFiles(sinkType='MEMORY', exportDir=None):
+    from vb30.lib import VRayStream
+
+    pm = VRayStream.VRayFilePaths()
+    pm.setExportDirectory(exportDir if exportDir else tempfile.gettempdir())
+    pm.setExportFilename("scene")
+    pm.setSeparateFiles(False)
+
+    fm = VRayStream.VRayExportFiles(pm)
+    fm.setSink(sinkType)
+
+    return fm
+
+
+# Plugin exporter writing into memory
+#
+def GetPluginExporter(ascii=False):
+    from vb30.lib import VRayStream
+
+    fm = GetExportFiles('MEMORY')
+    fm.init()
+
+    o = VRayStream.VRayPluginExporter()
+    o.setFileManager(fm)
+    o.setAscii(ascii)
+
+    return o
+
+
+def GetOutput(o):
+    return o.getFileManager().getOutputFile().getvalue()
+
+
+#### Importer
+
+class Socket:
+    def __init__(self, name):
+        self.name  = name
+        self.value = None
+
+
+class Sockets(dict):
+    def __missing__(self, name):
+        socket = Socket(name)
+        self[name] = socket
+        return socket
+
+
+class Node:
+    def __init__(self, nodeType):
+        self.bl_idname = nodeType
+        self.name      = nodeType
+        self.label     = None
+        self.inputs    = Sockets()
+        self.outputs   = Sockets()
+
+    # Plugin property group: getattr(node, pluginID)
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        propGroup = types.SimpleNamespace()
+        setattr(self, name, propGroup)
+        return propGroup
+
+
+# Node names are changed after creation, so nodes are
+# looked up by the current name
+#
+class Nodes:
+    def __init__(self):
+        self.nodes = []
+
+    def __contains__(self, name):
+        return any(node.name == name for node in self.nodes)
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def __getitem__(self, name):
+        for node in self.nodes:
+            if node.name == name:
+                return node
+        raise KeyError(name)
+
+    def new(self, nodeType):
+        node = Node(nodeType)
+        self.nodes.append(node)
+        return node
+
+
+class Links:
+    def __init__(self):
+        self.links = []
+
+    def new(self, output, input):
+        self.links.append((output, input))
+
+
+class NodeTree:
+    def __init__(self):
+        self.nodes = Nodes()
+        self.links = Links()
+
+
+# Returns vrscene dict with "count" plugins:
+# materials, each with its own texture
+#
+def GetVrsceneDict(count, seed=0):
+    rnd = random.Random(seed)
+
+    vrsceneDict = []
+    for i in range(count // 2):
+        vrsceneDict.append({
+            'ID'   : 'BRDFSynthetic',
+            'Name' : "Mtl%06i" % i,
+            'Attributes' : {
+                'diffuse'     : (rnd.random(), rnd.random(), rnd.random()),
+                'diffuse_tex' : "Tex%06i" % i,
+                'roughness'   : rnd.random(),
+                'subdivs'     : rnd.randint(1, 32),
+                'brdf_type'   : rnd.choice(('0', '1', '2')),
+            },
+        })
+        vrsceneDict.append({
+            'ID'   : 'TexSynthetic',
+            'Name' : "Tex%06i" % i,
+            'Attributes' : {
+                'diffuse'   : (rnd.random(), rnd.random(), rnd.random()),
+                'roughness' : rnd.random(),
+            },
+        })
+
+    return vrsceneDict
+
+
+def RegisterImporterPlugins():
+    from vb30.plugins import PLUGINS_ID
+
+    PLUGINS_ID['BRDFSynthetic'] = GetPluginModule('BRDFSynthetic', 'BRDF')
+    PLUGINS_ID['TexSynthetic']  = GetPluginModule('TexSynthetic',  'TEXTURE')
@@ -0,0 +1,138 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+# Threaded write (VRayAsyncFileBuffer): errors of the writer thread
+# are raised in the exporting thread
+#
+
+import io
+
+import pytest
+
+import synthetic
+
+from vb30.lib import VRayStream
+
+
+BufferSize = 64
+
+
+# File failing on write after the given number of writes
+#
+class FailingFile(io.StringIO):
+    def __init__(self, writesCount):
+        io.StringIO.__init__(self)
+        self.writesCount = writesCount
+        self.data = ""
+
+    def write(self, data):
+        if self.writesCount == 0:
+            raise OSError(28, "No space left on device")
+        self.writesCount -= 1
+        self.data += data
+        return io.StringIO.write(self, data)
+
+    def close(self):
+        self.data = self.getvalue()
+        io.StringIO.close(self)
+
+
+def GetBuffer(writesCount):
+    f = FailingFile(writesCount)
+    return f, VRayStream.VRayAsyncFileBuffer(VRayStream.VRayFileBuffer(f, "scene.vrscene", bufferSize=BufferSize))
+
+
+def WriteLines(buf, count):
+    for i in range(count):
+        buf.write("line %04i\n" % i)
+
+
+def test_write():
+    f, buf = GetBuffer(-1)
+
+    WriteLines(buf, 100)
+    buf.close()
+
+    assert f.closed
+    assert buf.closed
+    assert f.data == "".join("line %04i\n" % i for i in range(100))
+
+
+def test_error_on_flush():
+    f, buf = GetBuffer(1)
+
+    buf.write("line\n")
+    buf.flush()
+
+    buf.write("line\n")
+    with pytest.raises(OSError):
+        buf.flush()
+
+    # Next batch is not queued
+    with pytest.raises(OSError):
+        WriteLines(buf, 100)
+
+    # Wrapped buffer is still closed and the error is raised again
+    with pytest.raises(OSError):
+        buf.close()
+    assert f.closed
+    assert f.data == "line\n"
+
+
+def test_error_on_close():
+    f, buf = GetBuffer(0)
+
+    WriteLines(buf, 1)
+
+    with pytest.raises(OSError):
+        buf.close()
+    assert f.closed
+
+    # Closing again does nothing
+    buf.close()
+
+
+# Every file is closed and the first error is raised
+#
+def test_close_files():
+    fm = synthetic.GetExportFiles()
+
+    failing, failingBuf = GetBuffer(0)
+    f, buf = GetBuffer(-1)
+
+    fm.files = {
+        'scene'    : failingBuf,
+        'geometry' : buf,
+    }
+
+    WriteLines(failingBuf, 1)
+    WriteLines(buf, 100)
+
+    with pytest.raises(OSError):
+        fm.closeFiles()
+
+    assert failing.closed
+    assert f.closed
+    assert f.data == "".join("line %04i\n" % i for i in range(100))
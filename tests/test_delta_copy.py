@@ -0,0 +1,146 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+# Block delta copy (DeltaCopy)
+#
+
+import os
+import random
+
+from vb30.lib import VRayAssetStore
+
+
+BlockSize = 64
+
+
+def GetData(size, seed=0):
+    rnd = random.Random(seed)
+    return bytes(rnd.getrandbits(8) for i in range(size))
+
+
+def WriteFile(filepath, data):
+    with open(filepath, 'wb') as f:
+        f.write(data)
+
+
+def ReadFile(filepath):
+    with open(filepath, 'rb') as f:
+        return f.read()
+
+
+def DeltaCopy(tmp_path, data, prevData=None):
+    srcFilepath = str(tmp_path / "src.vrmesh")
+    dstFilepath = str(tmp_path / "dst.vrmesh")
+
+    if prevData is not None:
+        WriteFile(srcFilepath, prevData)
+        VRayAssetStore.DeltaCopy(srcFilepath, dstFilepath, BlockSize)
+
+    WriteFile(srcFilepath, data)
+
+    written = VRayAssetStore.DeltaCopy(srcFilepath, dstFilepath, BlockSize)
+
+    assert ReadFile(dstFilepath) == data
+
+    return written
+
+
+def test_new(tmp_path):
+    data = GetData(10 * BlockSize + 10)
+
+    assert DeltaCopy(tmp_path, data) == len(data)
+    assert os.path.exists(str(tmp_path / "dst.vrmesh") + VRayAssetStore.SignatureExt)
+
+
+def test_unchanged(tmp_path):
+    data = GetData(10 * BlockSize + 10)
+
+    assert DeltaCopy(tmp_path, data, data) == 0
+
+
+def test_one_block(tmp_path):
+    prevData = GetData(10 * BlockSize + 10)
+
+    data = bytearray(prevData)
+    data[3 * BlockSize + 5] ^= 0xff
+    data = bytes(data)
+
+    assert DeltaCopy(tmp_path, data, prevData) == BlockSize
+
+
+def test_grow(tmp_path):
+    prevData = GetData(10 * BlockSize)
+    data = prevData + GetData(BlockSize + 10, seed=1)
+
+    assert DeltaCopy(tmp_path, data, prevData) == BlockSize + 10
+
+
+def test_shrink(tmp_path):
+    prevData = GetData(10 * BlockSize + 10)
+    data = prevData[:4 * BlockSize + 20]
+
+    # Only the last partial block differs
+    assert DeltaCopy(tmp_path, data, prevData) == 20
+
+
+def test_empty(tmp_path):
+    prevData = GetData(10 * BlockSize)
+
+    assert DeltaCopy(tmp_path, b"", prevData) == 0
+
+
+# Destination changed not by DeltaCopy doesn't match the signature
+# and is rewritten completely
+#
+def test_foreign_modified(tmp_path):
+    data = GetData(10 * BlockSize + 10)
+
+    srcFilepath = str(tmp_path / "src.vrmesh")
+    dstFilepath = str(tmp_path / "dst.vrmesh")
+
+    WriteFile(srcFilepath, data)
+    VRayAssetStore.DeltaCopy(srcFilepath, dstFilepath, BlockSize)
+
+    # Same size, so only mtime tells the change
+    foreignData = GetData(len(data), seed=2)
+    WriteFile(dstFilepath, foreignData)
+    st = os.stat(dstFilepath)
+    os.utime(dstFilepath, (st.st_atime, st.st_mtime + 1.0))
+
+    assert VRayAssetStore.DeltaCopy(srcFilepath, dstFilepath, BlockSize) == len(data)
+    assert ReadFile(dstFilepath) == data
+
+
+def test_block_size_changed(tmp_path):
+    data = GetData(10 * BlockSize + 10)
+
+    srcFilepath = str(tmp_path / "src.vrmesh")
+    dstFilepath = str(tmp_path / "dst.vrmesh")
+
+    WriteFile(srcFilepath, data)
+    VRayAssetStore.DeltaCopy(srcFilepath, dstFilepath, BlockSize)
+
+    assert VRayAssetStore.DeltaCopy(srcFilepath, dstFilepath, 2 * BlockSize) == len(data)
+    assert VRayAssetStore.DeltaCopy(srcFilepath, dstFilepath, 2 * BlockSize) == 0
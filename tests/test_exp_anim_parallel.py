@@ -0,0 +1,144 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+# Parallel animation export: frame chunks and which chunks
+# export meshes
+#
+
+import os
+import sys
+
+import bpy
+import pytest
+
+import synthetic
+
+from vb30.exporting import exp_anim_parallel
+
+
+class Engine:
+    is_preview = False
+
+    def test_break(self):
+        return False
+
+    def update_progress(self, progress):
+        pass
+
+    def update_stats(self, stats, info):
+        pass
+
+
+# Worker process replacement: writes the chunk scene file
+# and records the command
+#
+class Process:
+    Commands = []
+
+    def __init__(self, cmd, stdout=None, stderr=None):
+        Process.Commands.append(cmd)
+        with open(os.path.join(cmd[-2], "scene.vrscene"), 'w') as f:
+            f.write("// Chunk\n")
+
+    def poll(self):
+        return 0
+
+
+def GetChunkArgs(cmd):
+    return cmd[cmd.index("--") + 1:]
+
+
+@pytest.fixture
+def bus(tmp_path, monkeypatch):
+    monkeypatch.setattr(exp_anim_parallel.subprocess, 'Popen', Process)
+    monkeypatch.setattr(exp_anim_parallel.time, 'sleep', lambda seconds: None)
+    Process.Commands = []
+
+    fm = synthetic.GetExportFiles('MEMORY', str(tmp_path))
+    fm.init()
+
+    o = synthetic.GetPluginExporter()
+    o.setFileManager(fm)
+    o.setAnimation(True)
+    o.setFrameStart(1)
+    o.setFrameEnd(100)
+    o.setFrameStep(1)
+
+    scene = bpy.NewScene()
+    scene.vray.Exporter.parallel_export_workers = 4
+    scene.vray.Exporter.auto_meshes = True
+
+    return {
+        'output' : o,
+        'scene'  : scene,
+        'engine' : Engine(),
+    }
+
+
+def test_frame_chunks():
+    assert exp_anim_parallel.GetFrameChunks(1, 100, 1, 4) == [(1, 25), (26, 50), (51, 75), (76, 100)]
+    assert exp_anim_parallel.GetFrameChunks(1, 10, 2, 4) == [(1, 3), (5, 7), (9, 9)]
+    assert exp_anim_parallel.GetFrameChunks(1, 2, 1, 4) == [(1, 1), (2, 2)]
+
+
+@pytest.mark.parametrize('animationMode, autoMeshes, expected', [
+    ('NOTMESHES', True,  ["1", "0", "0", "0"]),
+    ('NOTMESHES', False, ["0", "0", "0", "0"]),
+    ('FULL',      True,  ["1", "1", "1", "1"]),
+    ('FULL',      False, ["0", "0", "0", "0"]),
+])
+def test_chunk_meshes(bus, animationMode, autoMeshes, expected):
+    VRayExporter = bus['scene'].vray.Exporter
+    VRayExporter.animation_mode = animationMode
+    VRayExporter.auto_meshes    = autoMeshes
+
+    assert exp_anim_parallel.ExportParallel(bus) is None
+
+    assert [GetChunkArgs(cmd)[-1] for cmd in Process.Commands] == expected
+
+    # Chunks overlap by one frame
+    assert [GetChunkArgs(cmd)[1:3] for cmd in Process.Commands] == [["1", "25"], ["25", "50"], ["50", "75"], ["75", "100"]]
+
+    output = synthetic.GetOutput(bus['output'])
+    assert output.count("#include") == 4
+
+
+def test_export_chunk(tmp_path, monkeypatch):
+    scene = bpy.NewScene()
+    scene.vray.Exporter.auto_meshes = True
+
+    rendered = []
+    monkeypatch.setattr(bpy, 'ops', bpy.Namespace(render=bpy.Namespace(render=lambda scene: rendered.append(scene))), raising=False)
+    monkeypatch.setattr(bpy.data, 'scenes', {scene.name : scene}, raising=False)
+    monkeypatch.setattr(exp_anim_parallel, 'IsChunkExport', False)
+    monkeypatch.setattr(sys, 'argv', ["blender", "--", scene.name, "25", "50", "1", str(tmp_path), "0"])
+
+    exp_anim_parallel.ExportChunk()
+
+    assert rendered == [scene.name]
+    assert exp_anim_parallel.IsChunkExport
+    assert (scene.frame_start, scene.frame_end) == (25, 50)
+    assert scene.vray.Exporter.auto_meshes is False
+    assert scene.vray.Exporter.output_dir == str(tmp_path)
@@ -0,0 +1,85 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+# exp_objects.ExportObjects: when meshes are exported
+#
+
+import bpy
+import pytest
+
+import synthetic
+
+from vb30.exporting import exp_objects
+
+
+def GetBus(autoMeshes, pipelined):
+    scene = bpy.NewScene()
+    scene.vray.Exporter.auto_meshes = autoMeshes
+
+    camera = bpy.Namespace(
+        name = "Camera",
+        data = bpy.Namespace(vray=bpy.Namespace(hide_from_view=False)),
+    )
+
+    bus = {
+        'output'      : synthetic.GetPluginExporter(),
+        'scene'       : scene,
+        'camera'      : camera,
+        'exporter'    : object(),
+        'skipObjects' : set(),
+        'cache'       : {},
+    }
+    if pipelined:
+        bus['renderQueue'] = []
+
+    return bus
+
+
+def GetExportGeometry(nativeCalls):
+    calls = nativeCalls.GetCalls('exportScene')
+    assert len(calls) == 1
+    args, kwargs = calls[0]
+    return args[2]
+
+
+@pytest.mark.parametrize('autoMeshes', [False, True])
+def test_export_meshes_setting(nativeCalls, autoMeshes):
+    exp_objects.ExportObjects(GetBus(autoMeshes, False))
+
+    assert GetExportGeometry(nativeCalls) == autoMeshes
+
+
+# Every pipelined frame has its own geometry file
+#
+def test_export_meshes_pipelined(nativeCalls):
+    exp_objects.ExportObjects(GetBus(False, True))
+
+    assert GetExportGeometry(nativeCalls) is True
+
+
+def test_export_meshes_explicit(nativeCalls):
+    exp_objects.ExportObjects(GetBus(True, False), exportMeshes=False)
+
+    assert GetExportGeometry(nativeCalls) is False
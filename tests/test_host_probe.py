@@ -0,0 +1,183 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+# Render nodes probe against local sockets
+#
+
+import socket
+
+import pytest
+
+from vb30.lib import VRayHostProbe
+
+
+Timeout = 1.0
+
+
+@pytest.fixture
+def server():
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    s.bind(('127.0.0.1', 0))
+    s.listen(8)
+    yield s.getsockname()
+    s.close()
+
+
+# Port nothing listens on
+#
+@pytest.fixture
+def closedPort():
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    s.bind(('127.0.0.1', 0))
+    address = s.getsockname()
+    s.close()
+    return address
+
+
+@pytest.fixture
+def historyFilepath(tmp_path):
+    return str(tmp_path / VRayHostProbe.HistoryFilename)
+
+
+def test_probe(server, closedPort):
+    probe = VRayHostProbe.VRayHostProbe()
+
+    results = probe.probe([server, closedPort], Timeout)
+
+    assert results[VRayHostProbe.GetHostKey(*server)] >= 0.0
+    assert results[VRayHostProbe.GetHostKey(*closedPort)] is None
+
+    assert probe.getAvailability(VRayHostProbe.GetHostKey(*server)) == 1.0
+    assert probe.getAvailability(VRayHostProbe.GetHostKey(*closedPort)) == 0.0
+    assert probe.getLatency(VRayHostProbe.GetHostKey(*closedPort)) is None
+
+
+def test_select(server, closedPort):
+    probe = VRayHostProbe.VRayHostProbe()
+
+    assert probe.select([closedPort, server, server], Timeout) == [server]
+
+
+def test_select_max_latency(server):
+    probe = VRayHostProbe.VRayHostProbe()
+    key = VRayHostProbe.GetHostKey(*server)
+
+    # Recent slow result is reused instead of probing
+    probe.addSample(key, 500.0)
+
+    assert probe.select([server], Timeout, maxLatency=100.0) == []
+    assert probe.select([server], Timeout, maxLatency=1000.0) == [server]
+    assert probe.select([server], Timeout) == [server]
+
+
+# Hosts that were available more often go first, then the faster ones
+#
+def test_select_ranking():
+    hosts = [('10.0.0.%i' % i, 20207) for i in range(1, 4)]
+    keys  = [VRayHostProbe.GetHostKey(*host) for host in hosts]
+
+    probe = VRayHostProbe.VRayHostProbe()
+
+    # 10.0.0.1: available half of the time, fast
+    probe.addSample(keys[0], None, 1.0)
+    probe.addSample(keys[0], 1.0)
+    # 10.0.0.2: always available, slow
+    probe.addSample(keys[1], 50.0, 1.0)
+    probe.addSample(keys[1], 50.0)
+    # 10.0.0.3: always available, fast
+    probe.addSample(keys[2], 5.0, 1.0)
+    probe.addSample(keys[2], 5.0)
+
+    assert probe.select(hosts, Timeout) == [hosts[2], hosts[1], hosts[0]]
+
+
+def test_probe_reuse(server, closedPort, monkeypatch):
+    probe = VRayHostProbe.VRayHostProbe()
+    probe.probe([server, closedPort], Timeout)
+
+    probed = []
+    def probeHost(address, port, timeout):
+        probed.append((address, port))
+        return 1.0
+    monkeypatch.setattr(VRayHostProbe, 'ProbeHost', probeHost)
+
+    # Results are reused within the cache time, unreachable too
+    probe.probe([server, closedPort], Timeout)
+    assert probed == []
+
+    # and probed again after it
+    key = VRayHostProbe.GetHostKey(*server)
+    probe.history[key][-1][0] -= VRayHostProbe.ProbeCacheTime + 1.0
+
+    results = probe.probe([server, closedPort], Timeout)
+    assert probed == [server]
+    assert results[key] == 1.0
+    assert len(probe.history[key]) == 2
+
+
+def test_history_size():
+    probe = VRayHostProbe.VRayHostProbe()
+    for i in range(VRayHostProbe.HistorySize + 5):
+        probe.addSample("host:1", float(i))
+
+    assert len(probe.history["host:1"]) == VRayHostProbe.HistorySize
+    assert probe.getLastSample("host:1")[1] == VRayHostProbe.HistorySize + 4.0
+
+
+def test_save_load(server, closedPort, historyFilepath):
+    probe = VRayHostProbe.VRayHostProbe(historyFilepath)
+    probe.probe([server, closedPort], Timeout)
+    probe.save()
+
+    assert not probe.modified
+
+    loaded = VRayHostProbe.VRayHostProbe(historyFilepath)
+    loaded.load()
+
+    assert loaded.history == probe.history
+
+
+def test_load_errors(historyFilepath):
+    with open(historyFilepath, 'w') as f:
+        f.write("{")
+
+    probe = VRayHostProbe.VRayHostProbe(historyFilepath)
+    probe.load()
+    assert probe.history == {}
+
+    with open(historyFilepath, 'w') as f:
+        f.write('{"version" : -1, "hosts" : {"host:1" : [[0.0, 1.0]]}}')
+
+    probe.load()
+    assert probe.history == {}
+
+
+def test_get_host_probe(historyFilepath, monkeypatch):
+    monkeypatch.setattr(VRayHostProbe, 'ActiveProbe', None)
+
+    probe = VRayHostProbe.GetHostProbe(historyFilepath)
+
+    assert VRayHostProbe.GetHostProbe(historyFilepath) is probe
+    assert VRayHostProbe.GetHostProbe(historyFilepath + ".other") is not probe
@@ -0,0 +1,160 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+# Incremental export (VRayIncrementalFileBuffer): unchanged data
+# is not written, anything modified since the previous export
+# is rewritten
+#
+
+import json
+import os
+
+import pytest
+
+import synthetic
+
+from vb30.lib import VRayStream
+
+
+PluginsCount = 200
+
+# Small buffer gives a lot of batches
+BufferSize = 512
+
+
+def GetPlugins(changed=()):
+    plugins = []
+    for i in range(PluginsCount):
+        value = "Tex%04i" % i
+        if i in changed:
+            value = "Changed%04i" % i
+        plugins.append(("Plugin%04i" % i, value))
+    return plugins
+
+
+def Export(exportDir, plugins):
+    fm = synthetic.GetExportFiles('FILE', exportDir)
+    fm.setIncremental(True)
+    fm.setBufferSize(BufferSize)
+    fm.init()
+
+    o = VRayStream.VRayPluginExporter()
+    o.setFileManager(fm)
+
+    for pluginName, value in plugins:
+        o.set('BRDF', 'BRDFSynthetic', pluginName)
+        o.writeHeader()
+        o.writeAttibute('diffuse_tex', value)
+        o.writeFooter()
+
+    o.done()
+
+    return fm.getOutputFilepath()
+
+
+def ReadFile(filepath):
+    with open(filepath, 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture
+def exportDir(tmp_path):
+    return str(tmp_path)
+
+
+# Export of the same data without the previous export to compare with
+#
+@pytest.fixture
+def expected(tmp_path_factory):
+    def export(plugins):
+        return ReadFile(Export(str(tmp_path_factory.mktemp("full")), plugins))
+    return export
+
+
+def test_unchanged(exportDir, expected):
+    filepath = Export(exportDir, GetPlugins())
+    mtime = os.stat(filepath).st_mtime_ns
+
+    Export(exportDir, GetPlugins())
+
+    # File is not opened at all
+    assert os.stat(filepath).st_mtime_ns == mtime
+    assert ReadFile(filepath) == expected(GetPlugins())
+
+
+@pytest.mark.parametrize('changed', [(0,), (100,), (PluginsCount - 1,), (10, 150)])
+def test_changed(exportDir, expected, changed):
+    Export(exportDir, GetPlugins())
+
+    filepath = Export(exportDir, GetPlugins(changed))
+
+    assert ReadFile(filepath) == expected(GetPlugins(changed))
+
+
+def test_shorter(exportDir, expected):
+    Export(exportDir, GetPlugins())
+
+    filepath = Export(exportDir, GetPlugins()[:-10])
+
+    assert ReadFile(filepath) == expected(GetPlugins()[:-10])
+
+
+# File is modified after the export keeping the size
+#
+def test_externally_modified(exportDir, expected):
+    filepath = Export(exportDir, GetPlugins())
+    st = os.stat(filepath)
+
+    with open(filepath, 'r+b') as f:
+        f.write(b"XXXX")
+    # File timestamps are coarse, make sure the time differs
+    # like it would for any later modification
+    os.utime(filepath, ns=(st.st_atime_ns, st.st_mtime_ns + 1000000000))
+    assert os.stat(filepath).st_size == st.st_size
+
+    Export(exportDir, GetPlugins())
+
+    assert ReadFile(filepath) == expected(GetPlugins())
+
+
+# Index written before the file time was stored
+#
+def test_index_without_mtime(exportDir, expected):
+    filepath = Export(exportDir, GetPlugins())
+
+    indexFilepath = os.path.join(exportDir, "scene.vrscene.index")
+    with open(indexFilepath, 'r') as f:
+        index = json.load(f)
+    for fileIndex in index.values():
+        del fileIndex['mtime']
+    with open(indexFilepath, 'w') as f:
+        json.dump(index, f)
+
+    with open(filepath, 'r+b') as f:
+        f.write(b"XXXX")
+
+    Export(exportDir, GetPlugins())
+
+    assert ReadFile(filepath) == expected(GetPlugins())
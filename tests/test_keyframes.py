@@ -0,0 +1,130 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+# Keyframe reduction (ReduceKeyframes)
+#
+
+import mathutils
+
+import synthetic
+
+from vb30.lib import LibUtils
+from vb30.lib import VRayStream
+
+
+Tolerance = 1.0e-3
+
+
+def GetSamples(values):
+    return [(frame, LibUtils.GetNumericValue(value), value) for frame, value in enumerate(values, 1)]
+
+
+def test_short():
+    assert VRayStream.ReduceKeyframes([], Tolerance) == []
+    assert VRayStream.ReduceKeyframes(GetSamples([1.0, 5.0]), Tolerance) == [0, 1]
+
+
+def test_linear():
+    samples = GetSamples([0.5 * i for i in range(20)])
+
+    assert VRayStream.ReduceKeyframes(samples, Tolerance) == [0, 19]
+
+
+def test_constant():
+    samples = GetSamples([2.0] * 10)
+
+    assert VRayStream.ReduceKeyframes(samples, Tolerance) == [0, 9]
+
+
+# Value is held and then changes: the last held frame
+# must be kept, otherwise the hold would be interpolated
+#
+def test_hold():
+    samples = GetSamples([0.0, 0.0, 0.0, 0.0, 1.0, 2.0, 3.0])
+
+    assert VRayStream.ReduceKeyframes(samples, Tolerance) == [0, 3, 6]
+
+
+def test_step():
+    samples = GetSamples([0.0, 0.0, 0.0, 5.0, 5.0, 5.0])
+
+    assert VRayStream.ReduceKeyframes(samples, Tolerance) == [0, 2, 3, 5]
+
+
+def test_tolerance():
+    below = GetSamples([0.0, 1.0 + 0.5 * Tolerance, 2.0])
+    above = GetSamples([0.0, 1.0 + 2.0 * Tolerance, 2.0])
+
+    assert VRayStream.ReduceKeyframes(below, Tolerance) == [0, 2]
+    assert VRayStream.ReduceKeyframes(above, Tolerance) == [0, 1, 2]
+
+
+def GetMatrix(x, scale=1.0):
+    return mathutils.Matrix((
+        (scale, 0.0, 0.0, x),
+        (0.0, 1.0, 0.0, 0.0),
+        (0.0, 0.0, 1.0, 0.0),
+        (0.0, 0.0, 0.0, 1.0),
+    ))
+
+
+# Every matrix component is checked, not only the first one
+#
+def test_matrix():
+    linear = GetSamples([GetMatrix(float(i)) for i in range(5)])
+    scaled = GetSamples([GetMatrix(float(i), 2.0 if i == 2 else 1.0) for i in range(5)])
+
+    assert VRayStream.ReduceKeyframes(linear, Tolerance) == [0, 4]
+    assert VRayStream.ReduceKeyframes(scaled, Tolerance) == [0, 1, 2, 3, 4]
+
+
+def test_vector():
+    samples = GetSamples([mathutils.Vector((i, 2.0 * i, 0.0)) for i in range(5)] +
+                         [mathutils.Vector((4.0, 8.0, 1.0))])
+
+    assert VRayStream.ReduceKeyframes(samples, Tolerance) == [0, 4, 5]
+
+
+def test_writer():
+    o = synthetic.GetPluginExporter(ascii=True)
+    o.setAnimation(True)
+    o.setKeyframeReduction(True, Tolerance)
+
+    for frame in range(1, 11):
+        o.setFrame(frame)
+        o.set('MtlSingleBRDF', 'MtlSingleBRDFSynthetic', "Plugin")
+        o.writeHeader()
+        o.writeAttibute('scale', 0.5 * frame)
+        o.writeAttibute('double_sided', 1)
+        o.writeFooter()
+
+    o.writeKeyframes()
+
+    output = synthetic.GetOutput(o)
+
+    assert "scale=interpolate((1,%s),(10,%s));" % (LibUtils.FormatValue(0.5, ascii=True), LibUtils.FormatValue(5.0, ascii=True)) in output
+    assert output.count("scale=") == 1
+    # Not numeric values are written through the cache
+    assert "double_sided=interpolate((1,1));" in output
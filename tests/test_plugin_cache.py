@@ -0,0 +1,116 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+# VRayPluginExporter animation cache (VRayPluginCache)
+#
+
+import synthetic
+
+from vb30.lib import VRayStream
+
+
+def ExportFrames(o, frames):
+    for frame, plugins in enumerate(frames, 1):
+        o.setFrame(frame)
+        for pluginName, attrs in plugins:
+            o.set('BRDF', 'BRDFSynthetic', pluginName)
+            o.writeHeader()
+            for attrName, value in attrs:
+                o.writeAttibute(attrName, value)
+            o.writeFooter()
+
+
+def GetAnimationExporter():
+    o = synthetic.GetPluginExporter()
+    o.setAnimation(True)
+    return o
+
+
+def test_unchanged_value():
+    o = GetAnimationExporter()
+
+    ExportFrames(o, [[("Plugin", [('subdivs', 8)])]] * 3)
+
+    assert synthetic.GetOutput(o).count("subdivs=") == 1
+    assert "subdivs=interpolate((1,8));" in synthetic.GetOutput(o)
+
+
+# Value held for some frames gets a keyframe on the frame
+# before the change
+#
+def test_hold_keyframe():
+    o = GetAnimationExporter()
+
+    ExportFrames(o, [[("Plugin", [('subdivs', value)])] for value in (8, 8, 8, 16, 32)])
+
+    output = synthetic.GetOutput(o)
+    assert "subdivs=interpolate((3,8),(4,16));" in output
+    assert "subdivs=interpolate((5,32));" in output
+
+
+def test_large_value():
+    largeValue = lambda i: "List(%s)" % ",".join(["%i" % i] * VRayStream.CachePackSize)
+
+    o = GetAnimationExporter()
+
+    ExportFrames(o, [[("Plugin", [('channels', largeValue(i))])] for i in (1, 1, 1, 2)])
+
+    output = synthetic.GetOutput(o)
+    assert output.count("channels=") == 2
+    assert "channels=interpolate((3,%s),(4,%s));" % (largeValue(1), largeValue(2)) in output
+
+    data = o.pluginCache["Plugin"].data
+    assert type(data[1]) is tuple
+    assert VRayStream.UnpackCacheValue(data[1]) == largeValue(2)
+
+
+# Plugins writing the same attributes share the layout and the values
+#
+def test_shared_values():
+    o = GetAnimationExporter()
+
+    ExportFrames(o, [[("Plugin%i" % i, [('diffuse_tex', "Tex%i" % (i % 2)), ('subdivs', 8)]) for i in range(4)]])
+
+    caches = [o.pluginCache["Plugin%i" % i] for i in range(4)]
+    assert all(pluginCache.layout is caches[0].layout for pluginCache in caches)
+    assert caches[0].data[1] is caches[2].data[1]
+    assert caches[0].data[3] is caches[1].data[3]
+
+
+def test_prune_values(monkeypatch):
+    monkeypatch.setattr(VRayStream, 'CacheValuesLimit', 10)
+
+    o = GetAnimationExporter()
+    o.pluginCacheValuesLimit = 10
+
+    # Every frame all values change
+    ExportFrames(o, [[("Plugin%i" % i, [('subdivs', frame * 100 + i)]) for i in range(5)] for frame in range(3)])
+    assert len(o.pluginCacheValues) == 15
+
+    # Only the values of the last frame are left
+    o.setFrame(4)
+
+    assert sorted(o.pluginCacheValues) == ["%i" % (200 + i) for i in range(5)]
+    assert o.pluginCacheValuesLimit == 10
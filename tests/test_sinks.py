@@ -0,0 +1,160 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+# Output sinks: memory and socket sinks get the same exporter
+# output as the file
+#
+
+import os
+import socket
+import threading
+
+import bpy
+import pytest
+
+import synthetic
+
+from vb30.lib import ExportUtils
+from vb30.lib import VRayStream
+
+
+PluginsCount = 100
+
+
+# Accepts a single connection and collects everything
+# received until the connection is closed
+#
+class SinkServer:
+    def __init__(self, family, address):
+        self.socket = socket.socket(family, socket.SOCK_STREAM)
+        self.socket.bind(address)
+        self.socket.listen(1)
+        self.address = self.socket.getsockname()
+
+        self.chunks = []
+        self.thread = threading.Thread(target=self._serve)
+        self.thread.start()
+
+    def _serve(self):
+        conn, address = self.socket.accept()
+        with conn:
+            while True:
+                data = conn.recv(65536)
+                if not data:
+                    break
+                self.chunks.append(data)
+        self.socket.close()
+
+    def getvalue(self):
+        self.thread.join(timeout=10.0)
+        return b''.join(self.chunks).decode('utf-8')
+
+
+def Export(fm):
+    fm.init()
+
+    o = VRayStream.VRayPluginExporter()
+    o.setFileManager(fm)
+    o.setAscii(False)
+
+    bus = {
+        'output' : o,
+        'scene'  : bpy.context.scene,
+        'cache'  : {},
+    }
+
+    pluginModule = synthetic.GetPluginModule()
+    for pluginName, propGroup, mappedParams in synthetic.GetPlugins(pluginModule, PluginsCount):
+        ExportUtils.WritePlugin(bus, pluginModule, pluginName, propGroup, mappedParams)
+
+    o.done()
+
+    return o
+
+
+# Export time in the header differs between exports
+#
+def StripHeader(output):
+    return "\n".join(line for line in output.split("\n") if not line.startswith("// "))
+
+
+@pytest.fixture
+def fileOutput(tmp_path):
+    fm = synthetic.GetExportFiles('FILE', str(tmp_path))
+    Export(fm)
+    with open(fm.getOutputFilepath(), 'r') as f:
+        output = f.read()
+    assert output.count("\nBRDFSynthetic") == PluginsCount
+    return StripHeader(output)
+
+
+@pytest.mark.parametrize('threadedWrite', [False, True], ids=["direct", "threaded"])
+def test_memory_sink(fileOutput, threadedWrite):
+    fm = synthetic.GetExportFiles('MEMORY')
+    fm.setThreadedWrite(threadedWrite)
+
+    o = Export(fm)
+
+    assert StripHeader(synthetic.GetOutput(o)) == fileOutput
+
+
+@pytest.mark.parametrize('threadedWrite', [False, True], ids=["direct", "threaded"])
+def test_socket_sink_tcp(fileOutput, threadedWrite):
+    server = SinkServer(socket.AF_INET, ('127.0.0.1', 0))
+
+    fm = synthetic.GetExportFiles('FILE')
+    fm.setSink('SOCKET', server.address)
+    fm.setThreadedWrite(threadedWrite)
+
+    Export(fm)
+
+    assert StripHeader(server.getvalue()) == fileOutput
+
+
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason="No Unix domain sockets")
+def test_socket_sink_unix(fileOutput, tmp_path):
+    server = SinkServer(socket.AF_UNIX, os.path.join(str(tmp_path), "vray.sock"))
+
+    fm = synthetic.GetExportFiles('FILE')
+    fm.setSink('SOCKET', server.address)
+
+    Export(fm)
+
+    assert StripHeader(server.getvalue()) == fileOutput
+
+
+# Nothing is exported into the separate files with the socket sink
+#
+def test_socket_sink_separate_files(tmp_path):
+    server = SinkServer(socket.AF_INET, ('127.0.0.1', 0))
+
+    fm = synthetic.GetExportFiles('FILE', str(tmp_path))
+    fm.setSeparateFiles(True)
+    fm.setSink('SOCKET', server.address)
+
+    Export(fm)
+
+    assert server.getvalue().count("\nBRDFSynthetic") == PluginsCount
+    assert not os.listdir(str(tmp_path))
@@ -26,6 +26,7 @@ import bpy
 
 from vb30.lib import LibUtils
 from vb30.lib import DrawUtils
+from vb30.lib import VRayHostProbe
 from vb30     import plugins
 
 
@@ -502,7 +503,16 @@ class VRAY_UL_DR(bpy.types.UIList):
     def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
         port_override = ":%s" % item.port if item.port_override else ""
 
-        layout.label("%s [%s%s]" % (item.name, item.address, port_override))
+        # Last check result, if nodes were already checked
+        status = ""
+        probe = VRayHostProbe.ActiveProbe
+        if probe is not None:
+            port = item.port if item.port_override else data.port
+            lastSample = probe.getLastSample(VRayHostProbe.GetHostKey(item.address, port))
+            if lastSample:
+                status = " - %.0f ms" % lastSample[1] if lastSample[1] is not None else " - unreachable"
+
+        layout.label("%s [%s%s]%s" % (item.name, item.address, port_override, status))
         layout.prop(item, 'use', text="")
 
 
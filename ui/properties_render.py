@@ -27,7 +27,7 @@ import sys
 
 import bpy
 
-from vb30.lib import LibUtils, SysUtils, DrawUtils
+from vb30.lib import LibUtils, SysUtils, DrawUtils, VRayRenderQueue
 from vb30.ui  import classes
 from vb30     import plugins, preset, engine, debug
 
@@ -225,6 +225,11 @@ class VRAY_PT_output(classes.VRayRenderPanel):
 		isStdExporter = bpy.context.scene.render.engine != 'VRAY_RENDER_RT' or VRayExporter.backend == 'STD'
 		if VRayExporter.animation_mode == 'NONE' and isStdExporter:
 			col.prop(VRayExporter, 'image_to_blender')
+			if VRayExporter.image_to_blender:
+				row = layout.row()
+				row.prop(VRayExporter, 'split_render')
+				if VRayExporter.split_render:
+					row.prop(VRayExporter, 'split_render_regions')
 
 
 ########  ######## ##    ## ########  ######## ########
@@ -261,6 +266,32 @@ class VRAY_PT_render(classes.VRayRenderPanel):
 		if VRayExporter.useSeparateFiles:
 			layout.prop(VRayExporter, 'auto_meshes', text="Re-Export Meshes")
 
+		if VRayExporter.animation_mode not in {'NONE', 'FRAMEBYFRAME'}:
+			row = layout.row()
+			row.prop(VRayExporter, 'reduce_keyframes')
+			if VRayExporter.reduce_keyframes:
+				row.prop(VRayExporter, 'reduce_keyframes_tolerance')
+
+		if VRayExporter.animation_mode == 'FRAMEBYFRAME':
+			row = layout.row()
+			row.prop(VRayExporter, 'frame_pipeline')
+			if VRayExporter.frame_pipeline:
+				row.prop(VRayExporter, 'pipeline_renders')
+				row.prop(VRayExporter, 'pipeline_lookahead')
+				row.prop(VRayExporter, 'render_retries')
+
+			renderQueue = VRayRenderQueue.ActiveQueue
+			if renderQueue:
+				status = renderQueue.getStatus()
+				layout.label(text="Render Queue: %i rendering, %i queued, %i done, %i failed" % (
+					status['RUNNING'], status['QUEUED'], status['DONE'], status['FAILED']))
+
+		if VRayExporter.animation_mode in {'FULL', 'NOTMESHES'}:
+			row = layout.row()
+			row.prop(VRayExporter, 'parallel_export')
+			if VRayExporter.parallel_export:
+				row.prop(VRayExporter, 'parallel_export_workers')
+
 		split= layout.split()
 		col= split.column()
 		col.label(text="Modules:")
@@ -631,6 +662,22 @@ class VRAY_PT_exporter(classes.VRayRenderPanel):
 		if wide_ui:
 			col = split.column()
 		col.prop(VRayExporter, 'output_unique', text="Unique Filename")
+		split = layout.split()
+		col = split.column()
+		col.prop(VRayExporter, 'write_buffer_size', text="Write Buffer (MB)")
+		if wide_ui:
+			col = split.column()
+		col.prop(VRayExporter, 'write_binary')
+
+		split = layout.split()
+		col = split.column()
+		col.prop(VRayExporter, 'incremental_export')
+		if wide_ui:
+			col = split.column()
+		col.prop(VRayExporter, 'write_threaded')
+		layout.prop(VRayExporter, 'compression')
+		if VRayExporter.compression != 'NONE':
+			layout.prop(VRayExporter, 'compression_types')
 
 		layout.separator()
 		layout.label(text="Run:")
@@ -1267,6 +1314,10 @@ class VRAY_PT_dr(classes.VRayRenderPanel):
 			layout.prop(VRayDR, 'shared_dir')
 			if VRayDR.networkType == 'WW':
 				layout.prop(VRayDR, 'share_name')
+			row = layout.row()
+			row.prop(VRayDR, 'copyThreads')
+			row.prop(VRayDR, 'copyRetries')
+			layout.prop(VRayDR, 'deltaCopy')
 			layout.separator()
 
 		elif VRayDR.assetSharing == 'TRANSFER':
@@ -1290,6 +1341,11 @@ class VRAY_PT_dr(classes.VRayRenderPanel):
 
 		layout.prop(VRayDR, 'port', text="Port")
 		layout.prop(VRayDR, 'limitHosts')
+		layout.prop(VRayDR, 'probeHosts')
+		row = layout.row()
+		row.active = VRayDR.probeHosts
+		row.prop(VRayDR, 'probeTimeout')
+		row.prop(VRayDR, 'probeMaxLatency')
 		layout.separator()
 
 		split= layout.split()
@@ -1302,6 +1358,7 @@ class VRAY_PT_dr(classes.VRayRenderPanel):
 		col = col.row().column(align=True)
 		col.operator('vray.dr_nodes_load',       text="", icon="FILE_FOLDER")
 		col.operator('vray.dr_nodes_save',       text="", icon="SAVE_PREFS")
+		col.operator('vray.dr_nodes_probe',      text="", icon="FILE_REFRESH")
 
 		if VRayDR.nodes_selected >= 0 and len(VRayDR.nodes) > 0:
 			render_node= VRayDR.nodes[VRayDR.nodes_selected]